@@ -0,0 +1,157 @@
+"""Медленные клиенты на странице поста: WSGI против асинхронных
+представлений под ASGI при одинаковом объёме памяти на ответы.
+
+Оба режима держат не больше ``--in-flight`` ответов одновременно, то
+есть одинаковое число буферов с телом страницы. WSGI-сервер
+моделируется пулом из ``--in-flight`` потоков: поток занят, пока
+клиент не дочитает ответ. Под ASGI очередь ограничена семафором на
+``--in-flight`` запросов, ORM и шаблоны выполняются в пуле из
+``--threads`` потоков (``ASYNC_VIEW_THREADS``, ``core.aio``), а отдача
+идёт в цикле событий. Клиент читает ответ кусками по 64 КБ с задержкой
+``--chunk-delay`` на кусок. Все клиенты приходят разом, задержка
+считается от общего старта, с ожиданием свободного места. Каждый режим
+запускается в отдельном процессе; ``peak RSS`` — пиковая память
+процесса.
+
+    python benchmarks/asgi_load.py --clients 200 --in-flight 32
+"""
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import print_table, seed_posts, setup_django, use_temporary_database
+
+CHUNK_SIZE = 2 ** 16
+
+
+def prepare(directory, text_size):
+    use_temporary_database(directory)
+    from blog.models import Post
+    seed_posts('default', count=1, text_size=text_size)
+    return f'/posts/{Post.objects.get().pk}/'
+
+
+def run_wsgi(url, clients, in_flight, delay):
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.client import RequestFactory
+
+    application = WSGIHandler()
+    environ = RequestFactory()._base_environ(PATH_INFO=url)
+
+    start = time.perf_counter()
+
+    def handle(_):
+        status = []
+        body = b''.join(application(
+            dict(environ), lambda code, headers: status.append(code)
+        ))
+        for _ in range(0, len(body), CHUNK_SIZE):
+            time.sleep(delay)
+        assert status[0].startswith('200'), status
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=in_flight) as pool:
+        return list(pool.map(handle, range(clients)))
+
+
+def run_asgi(url, clients, in_flight, delay):
+    from django.core.handlers.asgi import ASGIHandler
+
+    application = ASGIHandler()
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': url, 'query_string': b'',
+        'headers': [(b'host', b'testserver')], 'server': ('testserver', 80),
+    }
+
+    start = time.perf_counter()
+
+    async def handle(slots):
+        status = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif message.get('body'):
+                await asyncio.sleep(delay)
+
+        async with slots:
+            await application(dict(scope), receive, send)
+        assert status == [200], status
+        return time.perf_counter() - start
+
+    async def main():
+        slots = asyncio.Semaphore(in_flight)
+        return await asyncio.gather(
+            *(handle(slots) for _ in range(clients))
+        )
+
+    return asyncio.run(main())
+
+
+def run_mode(args):
+    os.environ['BLOGICUM_ASYNC_VIEWS'] = '1' if args.mode == 'asgi' else '0'
+    os.environ['BLOGICUM_ASYNC_VIEW_THREADS'] = str(args.threads)
+    setup_django()
+    with tempfile.TemporaryDirectory() as tmp:
+        url = prepare(tmp, args.text_size)
+        start = time.perf_counter()
+        if args.mode == 'asgi':
+            latencies = run_asgi(
+                url, args.clients, args.in_flight, args.chunk_delay
+            )
+        else:
+            latencies = run_wsgi(
+                url, args.clients, args.in_flight, args.chunk_delay
+            )
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(
+        args.mode,
+        f'{args.clients / elapsed:.1f}',
+        f'{1000 * latencies[len(latencies) // 2]:.0f}',
+        f'{1000 * latencies[int(len(latencies) * 0.95)]:.0f}',
+        f'{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}',
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--in-flight', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--text-size', type=int, default=512 * 1024)
+    parser.add_argument('--chunk-delay', type=float, default=0.02)
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'))
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args)
+        return
+
+    rows = []
+    for mode in ('wsgi', 'asgi'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode,
+             '--clients', str(args.clients),
+             '--in-flight', str(args.in_flight),
+             '--threads', str(args.threads),
+             '--text-size', str(args.text_size),
+             '--chunk-delay', str(args.chunk_delay)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        rows.append(output.split())
+    print_table(
+        ('mode', 'req/s', 'p50 ms', 'p95 ms', 'peak RSS MB'), rows
+    )
+
+
+if __name__ == '__main__':
+    main()
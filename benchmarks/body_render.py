@@ -0,0 +1,57 @@
+"""Рендеринг текста поста: ``linebreaksbr`` на каждом просмотре против
+готового HTML из кэша (``blog.rendering``).
+
+    python benchmarks/body_render.py --renders 200
+"""
+import argparse
+
+from utils import print_table, setup_django, timer
+
+SIZES = (1_000, 50_000, 200_000, 1_000_000)
+
+
+def make_text(size):
+    line = 'Строка текста с <тегами> & "кавычками"\n'
+    return (line * (size // len(line) + 1))[:size]
+
+
+def measure(template, context, renders):
+    with timer() as result:
+        for _ in range(renders):
+            template.render(context)
+    return f'{1000 * result["elapsed"] / renders:.3f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--renders', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.template import Context, Template
+
+    from blog.models import Post
+
+    filtered = Template('{{ post.text|linebreaksbr }}')
+    stored = Template('{{ post.body_html }}')
+    rows = []
+    for pk, size in enumerate(SIZES, start=1):
+        post = Post(pk=pk, text=make_text(size))
+        context = Context({'post': post})
+        per_view = measure(filtered, context, args.renders)
+        post.body_html
+        cached = measure(stored, context, args.renders)
+        # Новый объект на каждом запросе: одно чтение из кэша.
+        with timer() as result:
+            for _ in range(args.renders):
+                stored.render(Context({'post': Post(pk=pk, text='')}))
+        fetched = f'{1000 * result["elapsed"] / args.renders:.3f}'
+        rows.append((size, per_view, fetched, cached))
+    print_table(
+        ('text bytes', 'linebreaksbr ms', 'cache get ms', 'in-memory ms'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Пропускная способность и занятость воркера при отдаче медиафайлов.
+
+Для каждого режима ``MEDIA_SERVING`` измеряет время, которое воркер
+тратит на запрос целого файла и запрос диапазона, и итоговые МБ/с.
+В режимах ``x-accel-redirect``/``x-sendfile`` тело передаёт фронт-сервер,
+поэтому воркер освобождается сразу после заголовков.
+
+    python benchmarks/media_throughput.py --size-mb 20 --requests 20
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from utils import print_table, setup_django
+
+MODES = ('django', 'x-sendfile', 'x-accel-redirect')
+
+
+def measure(client, url, requests, **headers):
+    transferred = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url, **headers)
+        if response.streaming:
+            transferred += sum(len(chunk) for chunk in response)
+        else:
+            transferred += len(response.content)
+    elapsed = time.perf_counter() - start
+    return elapsed, transferred
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client, override_settings
+    settings.ALLOWED_HOSTS.append('testserver')
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'posts_images').mkdir()
+        path = Path(tmp) / 'posts_images' / 'large.jpg'
+        path.write_bytes(os.urandom(args.size_mb * 1024 * 1024))
+        url = f'{settings.MEDIA_URL}posts_images/large.jpg'
+        client = Client()
+        for mode in MODES:
+            with override_settings(MEDIA_SERVING=mode, MEDIA_ROOT=tmp):
+                for label, headers in (
+                    ('full', {}),
+                    ('range 1MB', {'HTTP_RANGE': 'bytes=0-1048575'}),
+                ):
+                    elapsed, transferred = measure(
+                        client, url, args.requests, **headers
+                    )
+                    rows.append((
+                        mode,
+                        label,
+                        f'{1000 * elapsed / args.requests:.2f}',
+                        f'{transferred / elapsed / 2 ** 20:.0f}'
+                        if transferred else 'offloaded',
+                    ))
+    print_table(('mode', 'request', 'worker ms/req', 'worker MB/s'), rows)
+
+
+if __name__ == '__main__':
+    main()
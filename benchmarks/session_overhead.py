@@ -0,0 +1,73 @@
+"""Накладные расходы сессий и аутентификации на запрос главной страницы.
+
+Сравнивает анонимный запрос без cookie и авторизованные запросы с
+разными ``SESSION_ENGINE``: время запроса, число SQL-запросов и
+заголовки кэширования.
+
+    python benchmarks/session_overhead.py --requests 200
+"""
+import argparse
+import tempfile
+import time
+
+from utils import (print_table, seed_posts, setup_django,
+                   use_temporary_database)
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+)
+
+
+def measure(client, url, requests):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = client.get(url)
+        elapsed = time.perf_counter() - start
+    return (
+        f'{1000 * elapsed / requests:.2f}',
+        f'{len(queries) / requests:.1f}',
+        response.get('Cache-Control', '-'),
+        response.get('Vary', '-'),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--url', default='/pages/about/')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import Client, override_settings
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temporary_database(tmp)
+        user, _ = seed_posts('default', count=10)
+        rows.append(
+            ('anonymous', *measure(Client(), args.url, args.requests))
+        )
+        for engine in ENGINES:
+            with override_settings(SESSION_ENGINE=engine):
+                client = Client()
+                client.force_login(user)
+                rows.append((
+                    engine.rsplit('.', 1)[-1],
+                    *measure(client, args.url, args.requests),
+                ))
+    print_table(
+        ('session', 'ms/request', 'queries/request', 'Cache-Control',
+         'Vary'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
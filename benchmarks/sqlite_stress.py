@@ -0,0 +1,126 @@
+"""Многопоточный стресс-тест чтения/записи SQLite.
+
+Сравнивает профили ``default`` и ``production`` из
+``settings.DATABASE_PROFILES``: пропускную способность и долю ошибок
+``database is locked``, с прямыми записями и через поток-писатель
+(``core.writer``). Каждая операция эмулирует отдельный запрос:
+после неё соединение закрывается, если так требует ``CONN_MAX_AGE``.
+
+    python benchmarks/sqlite_stress.py --threads 16 --seconds 5
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+from utils import print_table, register_database, seed_posts, setup_django
+
+
+def request(alias, write_ratio, author, post_ids, serialized):
+    """Одна операция «запроса»: запись комментария или чтение ленты."""
+    from core.writer import run_write
+
+    from blog.models import Comment, Post
+
+    if random.random() >= write_ratio:
+        list(Post.published.using(alias).order_by('-pub_date')[:10])
+        return 'reads'
+    write = partial(
+        Comment.objects.using(alias).create,
+        text='Комментарий',
+        post_id=random.choice(post_ids),
+        author_id=author.id,
+    )
+    if serialized:
+        run_write(write, using=alias)
+    else:
+        write()
+    return 'writes'
+
+
+def run_profile(alias, threads, seconds, *request_args):
+    from django.db import OperationalError, connections
+
+    stats = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker():
+        local = {'reads': 0, 'writes': 0, 'locked': 0}
+        while time.monotonic() < deadline:
+            try:
+                local[request(alias, *request_args)] += 1
+            except OperationalError as error:
+                if 'locked' not in str(error):
+                    raise
+                local['locked'] += 1
+            finally:
+                connections[alias].close_if_unusable_or_obsolete()
+        connections[alias].close()
+        with lock:
+            for key, value in local.items():
+                stats[key] += value
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import override_settings
+
+    from blog.models import Post
+
+    rows = []
+    modes = [
+        (profile, settings_dict, serialized)
+        for profile, settings_dict in settings.DATABASE_PROFILES.items()
+        for serialized in (False, True)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile, settings_dict, serialized in modes:
+            alias = f'bench_{profile}_{int(serialized)}'
+            register_database(
+                alias,
+                {**settings_dict, 'NAME': Path(tmp) / f'{alias}.sqlite3'},
+            )
+            author, _ = seed_posts(alias)
+            post_ids = list(
+                Post.objects.using(alias).values_list('id', flat=True)
+            )
+            with override_settings(SERIALIZED_WRITES=serialized):
+                stats = run_profile(
+                    alias, args.threads, args.seconds, args.write_ratio,
+                    author, post_ids, serialized,
+                )
+            total = stats['reads'] + stats['writes'] + stats['locked']
+            rows.append((
+                profile,
+                'serialized' if serialized else 'direct',
+                f"{stats['reads'] / args.seconds:.0f}",
+                f"{stats['writes'] / args.seconds:.0f}",
+                stats['locked'],
+                f"{100 * stats['locked'] / max(total, 1):.2f}%",
+            ))
+    print_table(
+        ('profile', 'writes', 'reads/s', 'writes/s', 'locked', 'locked rate'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
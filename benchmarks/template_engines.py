@@ -0,0 +1,90 @@
+"""Шаблонизатор Django против Jinja2 (``core.jinja``) на одинаковых
+контекстах главной страницы и страницы поста.
+
+Оба движка берут скомпилированные шаблоны из своего кэша; данные
+загружаются один раз до замеров.
+
+    python benchmarks/template_engines.py --renders 200
+"""
+import argparse
+import tempfile
+
+from template_render import index_context, templates_setting
+from utils import (print_table, seed_posts, setup_django, timer,
+                   use_temporary_database)
+
+PAGES = {
+    'index': 'blog/index.html',
+    'post_detail': 'blog/post_detail.html',
+}
+
+
+def post_detail_context(request, comments):
+    from blog.forms import CommentForm
+    from blog.models import Comment, Post
+    from blog.rendering import attach_body_html
+
+    post = Post.published.order_by('-pub_date').first()
+    Comment.objects.bulk_create(
+        Comment(post=post, author=post.author, text=f'Комментарий {i}\n' * 5)
+        for i in range(comments)
+    )
+    context = {
+        'post': post,
+        'object': post,
+        'comments': attach_body_html(
+            list(post.comments.select_related('author'))
+        ),
+        'form': CommentForm(),
+    }
+    # HTML текста поста попадает в кэш до замеров.
+    post.body_html
+    return context
+
+
+def measure(name, context, request, using, renders):
+    from django.template.loader import render_to_string
+
+    render_to_string(name, context, request, using=using)
+    with timer() as result:
+        for _ in range(renders):
+            render_to_string(name, context, request, using=using)
+    return 1000 * result['elapsed'] / renders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--renders', type=int, default=200)
+    parser.add_argument('--comments', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import override_settings
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temporary_database(tmp)
+        seed_posts('default', count=30)
+        request, index = index_context()
+        contexts = {
+            'index': index,
+            'post_detail': post_detail_context(request, args.comments),
+        }
+        engines = [*templates_setting(True), settings.JINJA2_ENGINE]
+        with override_settings(TEMPLATES=engines):
+            for page, name in PAGES.items():
+                django_ms, jinja2_ms = (
+                    measure(name, contexts[page], request, using,
+                            args.renders)
+                    for using in ('django', 'jinja2')
+                )
+                rows.append((
+                    page, f'{django_ms:.3f}', f'{jinja2_ms:.3f}',
+                    f'{django_ms / jinja2_ms:.1f}x',
+                ))
+    print_table(('page', 'django ms', 'jinja2 ms', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Время рендера главной страницы с разными загрузчиками шаблонов.
+
+Сравнивает загрузчики без кэша, ``cached.Loader`` на первом рендере и
+после прогрева ``core.templating.warm_templates``. Данные страницы
+загружаются один раз; в рендер входят только запросы
+``post.comment_count`` из карточек.
+
+    python benchmarks/template_render.py --renders 200
+"""
+import argparse
+import tempfile
+
+from utils import (print_table, seed_posts, setup_django, timer,
+                   use_temporary_database)
+
+
+def templates_setting(cached):
+    from django.conf import settings
+
+    loaders = settings.TEMPLATE_LOADERS
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    return [{
+        **settings.TEMPLATES[0],
+        'OPTIONS': {**settings.TEMPLATES[0]['OPTIONS'], 'loaders': loaders},
+    }]
+
+
+def index_context():
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.paginator import Paginator
+    from django.test import RequestFactory
+
+    from blog.models import Post
+
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    posts = list(
+        Post.published.select_related('author').cards().order_by('-pub_date')
+    )
+    page = Paginator(posts, settings.POSTS_ON_PAGE).page(1)
+    return request, {
+        'page_obj': page, 'paginator': page.paginator,
+        'is_paginated': True, 'object_list': page.object_list,
+    }
+
+
+def measure(request, context, renders):
+    from django.template.loader import render_to_string
+
+    with timer() as first:
+        render_to_string('blog/index.html', context, request)
+    with timer() as result:
+        for _ in range(renders):
+            render_to_string('blog/index.html', context, request)
+    return (
+        f'{1000 * first["elapsed"]:.2f}',
+        f'{1000 * result["elapsed"] / renders:.3f}',
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--renders', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+
+    from core.templating import warm_templates
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temporary_database(tmp)
+        seed_posts('default', count=30)
+        request, context = index_context()
+        with override_settings(TEMPLATES=templates_setting(False)):
+            rows.append(
+                ('uncached', *measure(request, context, args.renders))
+            )
+        with override_settings(TEMPLATES=templates_setting(True)):
+            rows.append(
+                ('cached', *measure(request, context, args.renders))
+            )
+        with override_settings(TEMPLATES=templates_setting(True)):
+            with timer() as warmup:
+                count = warm_templates()
+            rows.append((
+                f'cached + warm-up ({count} templates, '
+                f'{1000 * warmup["elapsed"]:.1f} ms)',
+                *measure(request, context, args.renders),
+            ))
+    print_table(('loader', 'first render ms', 'ms/render'), rows)
+
+
+if __name__ == '__main__':
+    main()
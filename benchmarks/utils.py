@@ -0,0 +1,94 @@
+"""Общие помощники для скриптов нагрузочного тестирования.
+
+Скрипты запускаются из корня репозитория::
+
+    python benchmarks/<script>.py --help
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+
+def setup_django():
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    import django
+    django.setup()
+
+
+def register_database(alias, settings_dict, migrate=True):
+    """Добавляет алиас БД во время работы и при необходимости
+    накатывает на него миграции."""
+    from django.core.management import call_command
+    from django.db import connections
+
+    connections.databases[alias] = dict(settings_dict)
+    connections.ensure_defaults(alias)
+    connections.prepare_test_settings(alias)
+    if migrate:
+        call_command('migrate', database=alias, verbosity=0)
+
+
+def use_temporary_database(directory):
+    """Переключает ``default`` на новый файл в ``directory`` до первого
+    соединения и накатывает миграции."""
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+
+    database = connections.databases['default']
+    database['NAME'] = Path(directory) / 'bench.sqlite3'
+    call_command('migrate', verbosity=0)
+    settings.ALLOWED_HOSTS.append('testserver')
+
+
+def seed_posts(alias, count=50, text_size=2000):
+    """Создаёт автора, категорию и ``count`` опубликованных постов."""
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from blog.models import Category, Post
+
+    user = get_user_model().objects.using(alias).create(
+        username=f'bench-{alias}'
+    )
+    category = Category.objects.using(alias).create(
+        title='Бенчмарк', description='Бенчмарк', slug=f'bench-{alias}'
+    )
+    now = timezone.now()
+    Post.objects.using(alias).bulk_create(
+        Post(
+            title=f'Пост {i}',
+            text=('Слово ' * (text_size // 6)).strip(),
+            pub_date=now - timedelta(minutes=i),
+            author=user,
+            category=category,
+        )
+        for i in range(count)
+    )
+    return user, category
+
+
+@contextmanager
+def timer():
+    result = {}
+    start = time.perf_counter()
+    yield result
+    result['elapsed'] = time.perf_counter() - start
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(headers, *rows)
+    ]
+    line = '  '.join(f'{{:<{width}}}' for width in widths)
+    print(line.format(*headers))
+    print(line.format(*('-' * width for width in widths)))
+    for row in rows:
+        print(line.format(*row))
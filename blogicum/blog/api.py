@@ -0,0 +1,228 @@
+"""Read-only JSON API лент, постов и комментариев.
+
+Ответы собираются из ``values_list()`` без создания моделей и
+сериализуются ``orjson``. Правила видимости те же, что у HTML-страниц:
+``Post.published`` для лент, все свои посты в профиле автора и
+``Post.is_visible`` или авторство для страницы поста. Списки
+листаются курсором по ``(дата, id)`` — глубокие страницы не требуют
+``OFFSET``. Параметр ``?fields=id,title`` оставляет в ответе только
+перечисленные поля.
+"""
+import orjson
+from core.paginator import after_cursor, encode_cursor
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.views import View
+
+from .models import Category, Comment, Post, User
+
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'excerpt': 'excerpt',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created_at': 'created_at',
+    'author': 'author_id',
+}
+
+
+class ApiError(Exception):
+    status = 400
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        orjson.dumps(data), status=status, content_type='application/json'
+    )
+
+
+def image_url(name):
+    if not name:
+        return None
+    return Post._meta.get_field('image').storage.url(name)
+
+
+def visible_post(request, pk, lookups=()):
+    """Строка поста с полями ``lookups``, если пост виден запросу."""
+    row = (
+        Post.objects.filter(pk=pk)
+        .values_list(
+            'is_published', 'category__is_published', 'pub_date',
+            'author_id', *lookups,
+        )
+        .first()
+    )
+    if row is None:
+        raise Http404('Страница не найдена')
+    is_published, category_published, pub_date, author_id = row[:4]
+    visible = (is_published and category_published
+               and pub_date <= timezone.now())
+    if not visible and author_id != request.user.pk:
+        raise Http404('Страница не найдена')
+    return row[4:]
+
+
+class ApiView(View):
+    """Базовое представление API: выбор полей и ответы об ошибках."""
+
+    http_method_names = ['get', 'head', 'options']
+    replica_reads = True
+    cache_anonymous = True
+    fields = {}
+    default_fields = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return json_response({'detail': 'Не найдено'}, status=404)
+        except ApiError as error:
+            return json_response({'detail': str(error)}, status=error.status)
+
+    def get_fields(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(self.default_fields)
+        names = [name.strip() for name in requested.split(',')]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f'Неизвестные поля: {", ".join(unknown)}')
+        return list(dict.fromkeys(names))
+
+    def to_dicts(self, names, rows):
+        items = [dict(zip(names, row)) for row in rows]
+        if 'image' in names:
+            for item in items:
+                item['image'] = image_url(item['image'])
+        return items
+
+
+class CursorListView(ApiView):
+    """Список, который листается курсором по ``(cursor_field, id)``."""
+
+    cursor_field = None
+    descending = True
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def paginate(self, queryset):
+        try:
+            return after_cursor(
+                queryset, self.cursor_field, self.request.GET.get('cursor'),
+                self.descending,
+            )
+        except ValueError as error:
+            raise ApiError(str(error))
+
+    def next_url(self, value, pk):
+        params = self.request.GET.copy()
+        params['cursor'] = encode_cursor(value, pk)
+        return f'{self.request.path}?{params.urlencode()}'
+
+    def get_items(self, names, rows):
+        return self.to_dicts(names, rows)
+
+    def get(self, request, *args, **kwargs):
+        names = self.get_fields()
+        lookups = [self.fields[name] for name in names]
+        size = settings.API_PAGE_SIZE
+        rows = list(
+            self.paginate(self.get_queryset())
+            .values_list(self.cursor_field, 'id', *lookups)[:size + 1]
+        )
+        next_url = None
+        if len(rows) > size:
+            rows = rows[:size]
+            next_url = self.next_url(*rows[-1][:2])
+        return json_response({
+            'results': self.get_items(names, [row[2:] for row in rows]),
+            'next': next_url,
+        })
+
+
+class PostListApi(CursorListView):
+    fields = POST_FIELDS
+    default_fields = (
+        'id', 'title', 'excerpt', 'pub_date', 'author', 'category',
+        'location', 'image',
+    )
+    cursor_field = 'pub_date'
+
+    def get_queryset(self):
+        return Post.published.all()
+
+
+class CategoryPostsApi(PostListApi):
+
+    def get_queryset(self):
+        category_id = (
+            Category.objects
+            .filter(slug=self.kwargs['category_slug'], is_published=True)
+            .values_list('id', flat=True).first()
+        )
+        if category_id is None:
+            raise Http404('Страница не найдена')
+        return Post.published.filter(category_id=category_id)
+
+
+class ProfilePostsApi(PostListApi):
+
+    def get_queryset(self):
+        author_id = (
+            User.objects.filter(username=self.kwargs['username'])
+            .values_list('id', flat=True).first()
+        )
+        if author_id is None:
+            raise Http404('Страница не найдена')
+        if self.request.user.pk == author_id:
+            return Post.objects.filter(author_id=author_id)
+        return Post.published.filter(author_id=author_id)
+
+
+class PostApi(ApiView):
+    fields = POST_FIELDS
+    default_fields = tuple(POST_FIELDS)
+
+    def get(self, request, id):
+        names = self.get_fields()
+        row = visible_post(
+            request, id, [self.fields[name] for name in names]
+        )
+        return json_response(self.to_dicts(names, [row])[0])
+
+
+class CommentListApi(CursorListView):
+    fields = COMMENT_FIELDS
+    default_fields = tuple(COMMENT_FIELDS)
+    cursor_field = 'created_at'
+    descending = False
+
+    def get_queryset(self):
+        visible_post(self.request, self.kwargs['post_id'])
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
+
+    def get_items(self, names, rows):
+        items = super().get_items(names, rows)
+        if 'author' in names:
+            # Комментарии могут лежать в отдельной БД: имена авторов
+            # читаются вторым запросом, а не через JOIN.
+            usernames = dict(
+                User.objects.filter(
+                    pk__in={item['author'] for item in items}
+                ).values_list('id', 'username')
+            )
+            for item in items:
+                item['author'] = usernames.get(item['author'])
+        return items
@@ -0,0 +1,73 @@
+"""Кэшированные счётчики постов для пагинации лент.
+
+Вместо ``COUNT(*)`` по ``Post.published`` на каждом запросе число постов
+ленты и гистограмма по месяцам для архива берутся из кэша: общие, по
+категории и по автору. Сигналы (``blog.signals``) удаляют счётчики
+затронутых категорий и авторов при изменении поста, а изменение
+категории сбрасывает все счётчики сменой версии. Отложенные посты
+появляются в счётчиках не позже чем через ``POST_COUNT_TIMEOUT``.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+VERSION_KEY = 'post-count:version'
+
+
+def new_version():
+    # Версия, вытесненная из кэша, не должна совпасть со старой.
+    return time.time_ns()
+
+
+def counter_key(scope, pk=None):
+    version = cache.get_or_set(VERSION_KEY, new_version, None)
+    return f'post-count:{version}:{scope}:{pk or ""}'
+
+
+def cached_count(queryset, scope, pk=None):
+    key = counter_key(scope, pk)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.POST_COUNT_TIMEOUT)
+    return count
+
+
+def cached_months(queryset, scope, pk=None):
+    """Гистограмма ленты по месяцам: ``[(год, месяц, число), ...]``
+    от новых месяцев к старым."""
+    key = counter_key(f'{scope}-months', pk)
+    months = cache.get(key)
+    if months is None:
+        rows = (
+            queryset.order_by()
+            .annotate(month=TruncMonth('pub_date'))
+            .values('month')
+            .annotate(count=Count('id'))
+            .order_by('-month')
+            .values_list('month', 'count')
+        )
+        months = [(month.year, month.month, count) for month, count in rows]
+        cache.set(key, months, settings.POST_COUNT_TIMEOUT)
+    return months
+
+
+def invalidate_post_counts(category_ids=(), author_ids=()):
+    scopes = [('published', None)]
+    scopes += [('category', pk) for pk in category_ids if pk]
+    for pk in author_ids:
+        scopes += [('author', pk), ('author-all', pk)]
+    cache.delete_many([
+        counter_key(f'{scope}{suffix}', pk)
+        for scope, pk in scopes for suffix in ('', '-months')
+    ])
+
+
+def invalidate_all_post_counts():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, new_version(), None)
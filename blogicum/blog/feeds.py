@@ -0,0 +1,186 @@
+"""RSS- и Atom-ленты блога, категорий и авторов.
+
+Лента строится одним запросом к ``Post.published`` с ``only()`` по
+нужным столбцам: объект категории или автора берётся из первого поста,
+отдельный запрос нужен только для пустой ленты. Готовый XML хранится в
+кэше до изменения затронутого поста (``blog.signals``) или категории;
+ключи версионируются вместе со счётчиками постов (``blog.counters``).
+Ответы поддерживают ``ETag`` и ``If-Modified-Since``. Ссылки в
+кэшированном XML строятся от ``SITE_URL`` (``core.sites``), а не от
+заголовка ``Host`` первого запроса.
+"""
+import hashlib
+import time
+from types import SimpleNamespace
+
+from core.sites import site_url
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date, quote_etag
+
+from .counters import counter_key
+from .models import Category, Post, User
+
+FEED_FIELDS = (
+    'id', 'title', 'excerpt', 'pub_date',
+    'author__username', 'author__first_name', 'author__last_name',
+    'category__title', 'category__slug', 'category__description',
+)
+
+FEED_TYPES = {'rss': Rss201rev2Feed, 'atom': Atom1Feed}
+
+
+def feed_posts(**lookup):
+    return list(
+        Post.published.filter(**lookup)
+        .select_related(None).select_related('author', 'category')
+        .only(*FEED_FIELDS)
+        .order_by('-pub_date')[:settings.FEED_ITEMS]
+    )
+
+
+def feed_key(scope, kind, name=None):
+    return counter_key(f'feed-{kind}-{scope}', name)
+
+
+def invalidate_feeds(category_slugs=(), usernames=()):
+    keys = []
+    for kind in FEED_TYPES:
+        keys.append(feed_key('site', kind))
+        keys += [feed_key('category', kind, slug) for slug in category_slugs]
+        keys += [feed_key('author', kind, name) for name in usernames]
+    cache.delete_many(keys)
+
+
+class CachedFeed(Feed):
+    """Лента, которая отдаётся из кэша с условными заголовками."""
+
+    scope = 'site'
+
+    def __init__(self, kind='rss'):
+        super().__init__()
+        self.kind = kind
+        self.feed_type = FEED_TYPES[kind]
+
+    def cache_name(self, **kwargs):
+        return None
+
+    def __call__(self, request, *args, **kwargs):
+        key = feed_key(self.scope, self.kind, self.cache_name(**kwargs))
+        cached = cache.get(key)
+        if cached is None:
+            obj = self.get_object(request, *args, **kwargs)
+            obj.feed_path = request.path
+            feed = self.get_feed(obj, request)
+            content = feed.writeString('utf-8').encode()
+            cached = {
+                'content': content,
+                'content_type': feed.content_type,
+                'etag': quote_etag(hashlib.md5(content).hexdigest()),
+                'last_modified': int(time.time()),
+            }
+            cache.set(key, cached, settings.FEED_CACHE_TIMEOUT)
+        response = HttpResponse(
+            cached['content'], content_type=cached['content_type']
+        )
+        response['ETag'] = cached['etag']
+        response['Last-Modified'] = http_date(cached['last_modified'])
+        return get_conditional_response(
+            request, etag=cached['etag'],
+            last_modified=cached['last_modified'], response=response,
+        )
+
+    def feed_url(self, obj):
+        return site_url(obj.feed_path)
+
+    def items(self, obj):
+        return obj.feed_items
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_link(self, item):
+        return site_url(reverse('blog:post_detail', args=[item.id]))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.category.title]
+
+
+class SiteFeed(CachedFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума'
+
+    def get_object(self, request):
+        return SimpleNamespace(feed_items=feed_posts())
+
+    def link(self):
+        return site_url(reverse('blog:index'))
+
+
+class CategoryFeed(CachedFeed):
+    scope = 'category'
+
+    def cache_name(self, category_slug):
+        return category_slug
+
+    def get_object(self, request, category_slug):
+        posts = feed_posts(category__slug=category_slug)
+        if posts:
+            category = posts[0].category
+        else:
+            category = get_object_or_404(
+                Category, slug=category_slug, is_published=True
+            )
+        category.feed_items = posts
+        return category
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return site_url(
+            reverse('blog:category_posts', args=[category.slug])
+        )
+
+
+class AuthorFeed(CachedFeed):
+    scope = 'author'
+
+    def cache_name(self, username):
+        return username
+
+    def get_object(self, request, username):
+        posts = feed_posts(author__username=username)
+        if posts:
+            author = posts[0].author
+        else:
+            author = get_object_or_404(User, username=username)
+        author.feed_items = posts
+        return author
+
+    def title(self, author):
+        return f'Блогикум: публикации @{author.username}'
+
+    def description(self, author):
+        return self.title(author)
+
+    def link(self, author):
+        return site_url(reverse('blog:profile', args=[author.username]))
@@ -1,22 +1,46 @@
+from core.images import BoundedImageField, reencode_upload
+from core.writer import SerializedSaveMixin
 from django import forms
+from django.contrib.auth.forms import UserCreationForm
+from django.core.files.uploadedfile import UploadedFile
 
 from .models import Comment, Post, User
 
 
-class PostForm(forms.ModelForm):
+class PostForm(SerializedSaveMixin, forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
         fields = '__all__'
+        field_classes = {'image': BoundedImageField}
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            return reencode_upload(image)
+        return image
 
-class CommentForm(forms.ModelForm):
+    def save(self, commit=True):
+        try:
+            return super().save(commit)
+        finally:
+            # Хранилище могло переместить временный файл копии.
+            image = self.cleaned_data.get('image')
+            if commit and isinstance(image, UploadedFile):
+                image.close()
+
+
+class CommentForm(SerializedSaveMixin, forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text', )
 
 
-class ProfileForm(forms.ModelForm):
+class ProfileForm(SerializedSaveMixin, forms.ModelForm):
     class Meta:
         model = User
         fields = ['username', 'first_name', 'last_name', 'email']
+
+
+class RegistrationForm(SerializedSaveMixin, UserCreationForm):
+    pass
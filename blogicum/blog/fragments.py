@@ -0,0 +1,49 @@
+from core.fragments import register
+from django.template.loader import render_to_string
+
+from .forms import CommentForm
+
+
+def post_shell_key(post_id):
+    return f'post-shell:{post_id}'
+
+
+def is_author(request, author_id):
+    return request.user.is_authenticated and request.user.pk == int(author_id)
+
+
+@register('user_nav')
+def user_nav(request):
+    return render_to_string(
+        'includes/fragments/user_nav.html', request=request
+    )
+
+
+@register('post_actions')
+def post_actions(request, post_id, author_id):
+    if not is_author(request, author_id):
+        return ''
+    return render_to_string(
+        'includes/fragments/post_actions.html', {'post_id': post_id}
+    )
+
+
+@register('comment_form')
+def comment_form(request, post_id):
+    if not request.user.is_authenticated:
+        return ''
+    return render_to_string(
+        'includes/fragments/comment_form.html',
+        {'post_id': post_id, 'form': CommentForm()},
+        request=request,
+    )
+
+
+@register('comment_actions')
+def comment_actions(request, post_id, comment_id, author_id):
+    if not is_author(request, author_id):
+        return ''
+    return render_to_string(
+        'includes/fragments/comment_actions.html',
+        {'post_id': post_id, 'comment_id': comment_id},
+    )
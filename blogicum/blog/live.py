@@ -0,0 +1,198 @@
+"""Новые комментарии к посту в реальном времени (Server-Sent Events).
+
+``AddCommentView`` сохраняет комментарий, после фиксации транзакции
+сигнал (``blog.signals``) вызывает ``publish_comment``: событие с
+готовым HTML комментария рендерится один раз и раздаётся всем
+подписчикам поста через ``core.pubsub``. Поток ``blog:post_live``
+обслуживает ``LiveCommentsMiddleware`` перед ASGI-приложением Django:
+ответы Django 3.2 не умеют передавать тело асинхронно. Простаивающее
+соединение занимает только задачу в цикле событий, без потока и
+соединения с БД. Поток открыт только для опубликованных постов.
+
+При переподключении браузер присылает ``Last-Event-ID``, а страница
+поста — ``?after=`` с последним показанным комментарием: пропущенные
+комментарии дочитываются из БД. Под WSGI представление ``post_live``
+отвечает 204, и браузер не переподключается. Поток отвечает раньше
+middleware Django, поэтому заголовок ``Host`` сверяется с
+``ALLOWED_HOSTS`` здесь же.
+"""
+import asyncio
+
+import orjson
+from core.aio import run_in_pool
+from core.pubsub import broker
+from django.conf import settings
+from django.http import HttpResponse
+from django.http.request import split_domain_port, validate_host
+from django.template.loader import render_to_string
+from django.urls import Resolver404, resolve
+
+from .models import Comment, Post
+from .rendering import attach_body_html
+
+KEEPALIVE = b': keepalive\n\n'
+
+HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+
+def comment_channel(post_id):
+    return f'comments:{post_id}'
+
+
+def comment_event(comment):
+    data = orjson.dumps({
+        'id': comment.id,
+        'html': render_to_string(
+            'includes/comment.html', {'comment': comment, 'live': True}
+        ),
+    })
+    return comment.id, b'id: %d\nevent: comment\ndata: %s\n\n' % (
+        comment.id, data
+    )
+
+
+def publish_comment(comment):
+    channel = comment_channel(comment.post_id)
+    if broker.subscriber_count(channel):
+        broker.publish(channel, comment_event(comment))
+
+
+def missed_events(post_id, after):
+    comments = (
+        Comment.objects.filter(post_id=post_id, id__gt=after)
+        .order_by('id').prefetch_related('author')
+    )
+    return [comment_event(comment) for comment in attach_body_html(comments)]
+
+
+def post_live(request, id):
+    """Без ASGI живой ленты комментариев нет."""
+    return HttpResponse(status=204)
+
+
+def live_post_id(scope):
+    if scope['type'] != 'http' or scope['method'] != 'GET':
+        return None
+    try:
+        match = resolve(scope['path'])
+    except Resolver404:
+        return None
+    if match.view_name != 'blog:post_live':
+        return None
+    return match.kwargs['id']
+
+
+def last_event_id(scope):
+    """Последний полученный клиентом комментарий или ``None``."""
+    value = dict(scope['headers']).get(b'last-event-id', b'')
+    if not value:
+        query = scope.get('query_string', b'')
+        for pair in query.split(b'&'):
+            name, _, value = pair.partition(b'=')
+            if name == b'after':
+                break
+        else:
+            return None
+    return int(value) if value.isdigit() else None
+
+
+def allowed_host(scope):
+    """Проверка ``Host`` как в ``HttpRequest.get_host``."""
+    host = dict(scope['headers']).get(b'host', b'').decode('latin-1')
+    if not host and scope.get('server'):
+        host = scope['server'][0]
+    domain, _ = split_domain_port(host)
+    allowed_hosts = settings.ALLOWED_HOSTS
+    if settings.DEBUG and not allowed_hosts:
+        allowed_hosts = ['.localhost', '127.0.0.1', '[::1]']
+    return bool(domain) and validate_host(domain, allowed_hosts)
+
+
+async def respond(send, status):
+    await send({'type': 'http.response.start', 'status': status})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def pump(subscription, receive, send, last_id):
+    """Передаёт события подписки клиенту до его отключения."""
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        while not (subscription.overflowed and subscription.queue.empty()):
+            getter = asyncio.ensure_future(subscription.queue.get())
+            await asyncio.wait(
+                {getter, disconnected},
+                timeout=settings.LIVE_COMMENTS_KEEPALIVE,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if getter.done():
+                comment_id, body = getter.result()
+                if comment_id <= last_id:
+                    continue
+                last_id = comment_id
+            else:
+                getter.cancel()
+                if disconnected.done():
+                    return
+                body = KEEPALIVE
+            await send({
+                'type': 'http.response.body', 'body': body,
+                'more_body': True,
+            })
+        # Отставший клиент переподключится и дочитает пропущенное.
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
+
+
+async def stream_comments(scope, receive, send, post_id):
+    if not allowed_host(scope):
+        return await respond(send, 400)
+    if not await run_in_pool(Post.published.filter(pk=post_id).exists):
+        return await respond(send, 404)
+    after = last_event_id(scope)
+    channel = comment_channel(post_id)
+    # Подписка раньше чтения пропущенного: событие между ними придёт
+    # дважды и будет отброшено по id, но не потеряется.
+    subscription = broker.subscribe(
+        channel, settings.LIVE_COMMENTS_QUEUE_SIZE
+    )
+    try:
+        missed = []
+        if after is not None:
+            missed = await run_in_pool(missed_events, post_id, after)
+        await send({
+            'type': 'http.response.start', 'status': 200, 'headers': HEADERS,
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'retry: %d\n\n' % settings.LIVE_COMMENTS_RETRY
+            + b''.join(body for _, body in missed),
+            'more_body': True,
+        })
+        after = missed[-1][0] if missed else after or 0
+        await pump(subscription, receive, send, after)
+    finally:
+        broker.unsubscribe(channel, subscription)
+
+
+class LiveCommentsMiddleware:
+    """ASGI-обёртка: ``blog:post_live`` — поток событий, остальное —
+    приложению Django."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        post_id = live_post_id(scope)
+        if post_id is None:
+            return await self.application(scope, receive, send)
+        await stream_comments(scope, receive, send, post_id)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.related import build_related_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает похожие посты (TF-IDF и косинусное сходство). '
+        'По умолчанию — только для постов, текст которых изменился, и '
+        'постов, чьи списки это затрагивает.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать списки всех опубликованных постов.',
+        )
+
+    def handle(self, *args, **options):
+        posts, updated, removed = build_related_posts(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Опубликованных постов: {posts}, пересчитано списков: '
+            f'{updated}, убрано из индекса: {removed}'
+        ))
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.models import Comment, Post, User
+from blog.signals import delete_in_batches
+
+
+def batches(values, size):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет ссылочную целостность комментариев: находит '
+        'комментарии к удалённым постам и от удалённых пользователей. '
+        'Работает и когда комментарии хранятся в отдельной БД.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Удалить найденные комментарии-сироты.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = settings.COMMENTS_BATCH_SIZE
+        for field, model in (('post_id', Post), ('author_id', User)):
+            referenced = set(
+                Comment.objects.values_list(field, flat=True).distinct()
+            )
+            existing = set()
+            for batch in batches(referenced, batch_size):
+                existing.update(
+                    model.objects.filter(pk__in=batch).values_list(
+                        'pk', flat=True
+                    )
+                )
+            missing = referenced - existing
+            self.stdout.write(
+                f'{field}: ссылок {len(referenced)}, '
+                f'несуществующих {len(missing)}'
+            )
+            if not (missing and options['delete']):
+                continue
+            deleted = sum(
+                delete_in_batches(
+                    Comment.objects.filter(**{f'{field}__in': batch})
+                )
+                for batch in batches(missing, batch_size)
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'Удалено комментариев: {deleted}')
+            )
@@ -0,0 +1,78 @@
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+def walk_sorted(root, relative='', cursor=''):
+    """Обходит файлы под ``root`` в лексикографическом порядке полных
+    относительных путей, начиная после ``cursor``."""
+    try:
+        entries = list(os.scandir(os.path.join(root, relative)))
+    except FileNotFoundError:
+        return
+    keyed = sorted(
+        (entry.name + '/' if entry.is_dir() else entry.name, entry)
+        for entry in entries
+    )
+    for key, entry in keyed:
+        path = f'{relative}{key}'
+        if entry.is_dir():
+            # Все пути каталога меньше курсора — каталог пройден раньше.
+            if cursor and path < cursor and not cursor.startswith(path):
+                continue
+            yield from walk_sorted(root, path, cursor)
+        elif path > cursor:
+            yield path, entry
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет изображения постов, на которые не ссылается ни один пост '
+        'и которые старше MEDIA_GC_GRACE_PERIOD. Дерево обходится '
+        'порциями по --limit файлов с продолжением с места остановки, '
+        'поэтому команду удобно запускать по расписанию, например cron:\n'
+        '*/30 * * * * python manage.py collect_media_garbage'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100_000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        root = field.storage.path('')
+        state_file = Path(settings.MEDIA_GC_STATE_FILE)
+        cursor = state_file.read_text() if state_file.exists() else ''
+        referenced = set(
+            Post.objects.exclude(image='').values_list('image', flat=True)
+            .iterator()
+        )
+        deadline = time.time() - settings.MEDIA_GC_GRACE_PERIOD
+        scanned = deleted = reclaimed = 0
+        last = ''
+        for name, entry in walk_sorted(root, f'{field.upload_to}/', cursor):
+            scanned += 1
+            last = name
+            if name not in referenced:
+                stat = entry.stat()
+                if stat.st_mtime < deadline:
+                    if not options['dry_run']:
+                        os.remove(entry.path)
+                    deleted += 1
+                    reclaimed += stat.st_size
+            if scanned >= options['limit']:
+                break
+        else:
+            last = ''
+        if not options['dry_run']:
+            state_file.write_text(last)
+        self.stdout.write(self.style.SUCCESS(
+            f'Просмотрено файлов: {scanned}, удалено: {deleted}, '
+            f'освобождено байт: {reclaimed}'
+            + (f', продолжение после {last}' if last else '')
+        ))
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blog.models import Comment
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует комментарии из основной БД в COMMENTS_DATABASE пачками '
+        'по первичному ключу. Запускается один раз после включения '
+        'BLOGICUM_COMMENTS_DATABASE и migrate --database=comments; '
+        'уже перенесённые комментарии пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Удалить скопированные комментарии из основной БД.',
+        )
+
+    def handle(self, *args, **options):
+        target = settings.COMMENTS_DATABASE
+        if target not in connections.databases:
+            raise CommandError(
+                f'БД `{target}` не настроена: включите '
+                'BLOGICUM_COMMENTS_DATABASE=1.'
+            )
+        batch_size = settings.COMMENTS_BATCH_SIZE
+        source = Comment.objects.using(DEFAULT_DB_ALIAS).order_by('pk')
+        last = 0
+        copied = skipped = deleted = 0
+        while True:
+            batch = list(source.filter(pk__gt=last)[:batch_size])
+            if not batch:
+                break
+            last = batch[-1].pk
+            ids = [comment.pk for comment in batch]
+            present = set(
+                Comment.objects.using(target).filter(pk__in=ids)
+                .values_list('pk', flat=True)
+            )
+            missing = [
+                comment for comment in batch if comment.pk not in present
+            ]
+            Comment.objects.using(target).bulk_create(missing)
+            copied += len(missing)
+            skipped += len(present)
+            if options['delete']:
+                deleted += source.filter(pk__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(
+            f'Скопировано комментариев: {copied}, уже были: {skipped}, '
+            f'удалено из основной БД: {deleted}'
+        ))
@@ -0,0 +1,64 @@
+from core.writer import run_write
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from blog.fragments import post_shell_key
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит изображения постов в раскладку по хэшу содержимого '
+        '(posts_images/ab/cd/<sha256>.<ext>) пачками, без остановки сайта: '
+        'файл сначала копируется, затем ссылка в посте меняется условным '
+        'UPDATE. Старые файлы остаются для уже отданных страниц, пока их '
+        'не удалит --delete-old или сборщик мусора.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--delete-old',
+            action='store_true',
+            help='Удалить старый файл, если на него больше нет ссылок.',
+        )
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        moved = missing = 0
+        last_id = 0
+        while True:
+            batch = list(
+                Post.objects.filter(id__gt=last_id)
+                .exclude(image='')
+                .order_by('id')
+                .values_list('id', 'image')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            renames = {}
+            for _, name in batch:
+                if name in renames or storage.is_content_name(name):
+                    continue
+                if not storage.exists(name):
+                    missing += 1
+                    continue
+                with storage.open(name) as file:
+                    renames[name] = storage.save(name, file)
+            for old, new in renames.items():
+                ids = [pk for pk, name in batch if name == old]
+                moved += run_write(
+                    Post.objects.filter(id__in=ids, image=old).update,
+                    image=new,
+                )
+                cache.delete_many([post_shell_key(pk) for pk in ids])
+                if (options['delete_old']
+                        and not Post.objects.filter(image=old).exists()):
+                    storage.delete(old)
+            self.stdout.write(
+                f'Обработано до id={last_id}, перенесено {moved}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено изображений: {moved}, не найдено файлов: {missing}'
+        ))
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-19 04:36
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+def backfill_excerpts(apps, schema_editor):
+    """Заполняет анонсы пачками, не загружая все тексты разом."""
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias)
+    last_id = 0
+    while True:
+        batch = list(
+            posts.filter(id__gt=last_id).order_by('id')
+            .only('id', 'text')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = Truncator(post.text).words(
+                settings.POST_EXCERPT_WORDS, truncate=' …'
+            )
+        posts.bulk_update(batch, ['excerpt'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_post_image_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
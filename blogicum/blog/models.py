@@ -1,12 +1,21 @@
 from core.models import PublishedModel
+from core.storage import ContentAddressedStorage
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.utils import timezone
+from django.utils.text import Truncator
+
+from .rendering import RenderedBodyMixin
 
 User = get_user_model()
 
 
+def make_excerpt(text):
+    """Анонс поста для карточек ленты, как ``truncatewords``."""
+    return Truncator(text).words(settings.POST_EXCERPT_WORDS, truncate=' …')
+
+
 class Category(PublishedModel):
     title = models.CharField(
         'Заголовок',
@@ -57,13 +66,17 @@ class PostQueryset(models.QuerySet):
             category__is_published=True
         ).select_related('author', 'category', 'location')
 
+    def cards(self):
+        """Посты для карточек ленты: вместо полного текста — анонс."""
+        return self.defer('text')
+
 
 class PublishedPostManager(models.Manager):
     def get_queryset(self):
         return PostQueryset(self.model, using=self._db).published()
 
 
-class Post(PublishedModel):
+class Post(RenderedBodyMixin, PublishedModel):
     objects = PostQueryset.as_manager()
     published = PublishedPostManager()
     title = models.CharField(
@@ -72,7 +85,13 @@ class Post(PublishedModel):
         blank=False
     )
     text = models.TextField('Текст', blank=False)
-    image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    excerpt = models.TextField('Анонс', blank=True, editable=False)
+    image = models.ImageField(
+        'Фото',
+        upload_to='posts_images',
+        storage=ContentAddressedStorage(),
+        blank=True
+    )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         auto_now_add=False,
@@ -107,6 +126,31 @@ class Post(PublishedModel):
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        # Ленты и архивы по месяцам читают диапазоны pub_date.
+        indexes = [
+            models.Index(fields=['pub_date'], name='post_pub_date_idx'),
+            models.Index(
+                fields=['category', 'pub_date'],
+                name='post_category_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date'], name='post_author_pub_date_idx'
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
+    @property
+    def is_visible(self):
+        """Виден ли пост всем, а не только автору."""
+        return (self.is_published and self.category.is_published
+                and self.pub_date <= timezone.now())
 
     @property
     def comment_count(self):
@@ -116,17 +160,22 @@ class Post(PublishedModel):
         return self.title
 
 
-class Comment(PublishedModel):
+class Comment(RenderedBodyMixin, PublishedModel):
+    # Комментарии могут храниться в отдельной БД (settings.COMMENTS_DATABASE),
+    # поэтому связи без ограничений на уровне БД, а каскадное удаление
+    # выполняет blog.signals.
     text = models.TextField("Текст")
     post = models.ForeignKey(
         Post,
-        on_delete=models.CASCADE,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
         related_name='comments',
         verbose_name="Пост",
     )
     author = models.ForeignKey(
         User,
-        on_delete=models.CASCADE,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
         verbose_name="Автор",
         editable=False
     )
@@ -138,3 +187,52 @@ class Comment(PublishedModel):
 
     def __str__(self):
         return self.text[:settings.MAX_SELF_COMMENT_LENGTH]
+
+
+class RelatedPost(models.Model):
+    """Похожий пост, найденный заранее командой ``build_related_posts``."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_links',
+        verbose_name='Пост',
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='linked_from',
+        verbose_name='Похожий пост',
+    )
+    score = models.FloatField('Сходство')
+    rank = models.PositiveSmallIntegerField('Место')
+
+    class Meta:
+        ordering = ('post', 'rank')
+        verbose_name = 'похожий пост'
+        verbose_name_plural = 'Похожие посты'
+        # Страница поста читает свой список одним запросом по индексу.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'rank'], name='related_post_rank_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} → {self.related_id}'
+
+
+class IndexedPost(models.Model):
+    """Отпечаток текста поста, по которому посчитаны похожие посты."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+    )
+    digest = models.CharField('Отпечаток', max_length=32)
+
+    class Meta:
+        verbose_name = 'проиндексированный пост'
+        verbose_name_plural = 'Проиндексированные посты'
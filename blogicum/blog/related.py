@@ -0,0 +1,224 @@
+"""Похожие посты: TF-IDF по заголовку и тексту и косинусное сходство.
+
+Списки считает офлайн команда ``build_related_posts`` и сохраняет в
+``RelatedPost``; страница поста читает готовый список одним запросом.
+
+Посты читаются потоком и сразу складываются в разреженную матрицу X
+(CSR, строка — пост, столбец — термин) с нормой строк 1: память
+пропорциональна числу ненулевых весов, тексты не хранятся. Термины из
+единственного поста сходства не дают и из X убираются, слишком частые
+(``RELATED_POSTS_MAX_DF``) отбрасываются как стоп-слова. Сходства
+считаются пачками по ``RELATED_POSTS_CHUNK_SIZE`` постов:
+``X[пачка] @ Xᵀ`` — плотная матрица пачка × все посты, из каждой строки
+``argpartition`` выбирает лучшие. Каждая пачка записывается своей
+транзакцией.
+
+Без ``full`` пересчитываются только посты, текст которых изменился
+(по отпечатку в ``IndexedPost``), и посты, в чьи списки изменённые
+могут войти или из которых выпасть. Веса IDF берутся по всему корпусу,
+но списки остальных постов не трогаются — их выравнивает периодический
+полный пересчёт.
+"""
+import hashlib
+import re
+from array import array
+from collections import Counter
+
+import numpy as np
+from core.writer import run_write
+from django.conf import settings
+from django.db.models import Count, Min
+from scipy import sparse
+
+from .models import IndexedPost, Post, RelatedPost
+
+TOKEN_RE = re.compile(r'[^\W\d_]{3,}')
+
+# Слово заголовка весит как столько же слов текста.
+TITLE_WEIGHT = 2
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def text_digest(title, text):
+    data = f'{title}\0{text}'.encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def chunks(values, size):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def diagonal(values):
+    return sparse.diags(values.astype(np.float32))
+
+
+class Corpus:
+    """Матрица TF-IDF постов; строки упорядочены по id."""
+
+    def __init__(self, rows, max_df):
+        self.digests = {}
+        vocabulary = {}
+        ids = array('q')
+        indptr = array('q', [0])
+        indices = array('q')
+        counts = array('f')
+        for pk, title, text in rows:
+            self.digests[pk] = text_digest(title, text)
+            terms = Counter(tokenize(text))
+            for token in tokenize(title):
+                terms[token] += TITLE_WEIGHT
+            for token, count in terms.items():
+                indices.append(vocabulary.setdefault(token, len(vocabulary)))
+                counts.append(count)
+            ids.append(pk)
+            indptr.append(len(indices))
+        self.ids = np.array(ids, dtype=np.int64)
+        size = len(self.ids)
+        matrix = sparse.csr_matrix(
+            (np.array(counts, dtype=np.float32),
+             np.array(indices, dtype=np.int64),
+             np.array(indptr, dtype=np.int64)),
+            shape=(size, len(vocabulary)),
+        )
+        df = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = np.log((1 + size) / (1 + df)) + 1
+        idf[df > max_df * size] = 0
+        matrix.data = 1 + np.log(matrix.data)
+        matrix = matrix @ diagonal(idf)
+        norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+        norms[norms == 0] = 1
+        matrix = diagonal(1 / norms) @ matrix @ diagonal(df > 1)
+        matrix.eliminate_zeros()
+        self.matrix = matrix.tocsr()
+        self.transposed = self.matrix.T.tocsr()
+
+    def __contains__(self, pk):
+        return pk in self.digests
+
+    def rows(self, pks):
+        return np.searchsorted(self.ids, pks)
+
+    def similarities(self, pks):
+        """Плотная матрица сходства постов ``pks`` со всеми постами."""
+        rows = self.rows(pks)
+        scores = (self.matrix[rows] @ self.transposed).toarray()
+        scores[np.arange(len(rows)), rows] = 0
+        return scores
+
+    def top(self, pks, count):
+        """Для каждого поста — до ``count`` пар (id, сходство)."""
+        count = min(count, len(self.ids) - 1)
+        if count <= 0:
+            return [[] for _ in pks]
+        scores = self.similarities(pks)
+        best = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best = self.ids[np.take_along_axis(best, order, axis=1)]
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        return [
+            [(int(pk), float(score))
+             for pk, score in zip(row, row_scores) if score > 0]
+            for row, row_scores in zip(best, best_scores)
+        ]
+
+
+def list_thresholds(corpus, count):
+    """Наименьшее сходство в полных списках; для неполных — 0."""
+    thresholds = np.zeros(len(corpus.ids), dtype=np.float32)
+    full_lists = [
+        (pk, lowest) for pk, lowest in
+        RelatedPost.objects.order_by().values('post_id')
+        .annotate(links=Count('id'), lowest=Min('score'))
+        .filter(links__gte=count)
+        .values_list('post_id', 'lowest').iterator()
+        if pk in corpus
+    ]
+    if full_lists:
+        pks, lowest = zip(*full_lists)
+        thresholds[corpus.rows(pks)] = lowest
+    return thresholds
+
+
+def affected_posts(corpus, changed, removed, count):
+    """Посты, списки которых меняются из-за изменённых и удалённых."""
+    chunk_size = settings.RELATED_POSTS_CHUNK_SIZE
+    targets = set(changed)
+    thresholds = list_thresholds(corpus, count)
+    for pks in chunks(changed, chunk_size):
+        entering = (corpus.similarities(pks) > thresholds).any(axis=0)
+        targets.update(corpus.ids[entering].tolist())
+    for pks in chunks(changed | removed, chunk_size):
+        targets.update(
+            pk for pk in RelatedPost.objects.filter(related_id__in=pks)
+            .order_by().values_list('post_id', flat=True).distinct()
+            if pk in corpus
+        )
+    return targets
+
+
+def replace_links(corpus, pks, count):
+    links = [
+        RelatedPost(post_id=pk, related_id=related, score=score, rank=rank)
+        for pk, top in zip(pks, corpus.top(pks, count))
+        for rank, (related, score) in enumerate(top, 1)
+    ]
+
+    def write():
+        RelatedPost.objects.filter(post_id__in=pks).delete()
+        RelatedPost.objects.bulk_create(links)
+
+    run_write(write)
+
+
+def replace_digests(corpus, pks):
+    indexed = [
+        IndexedPost(post_id=pk, digest=corpus.digests[pk])
+        for pk in pks if pk in corpus
+    ]
+    removed = [pk for pk in pks if pk not in corpus]
+
+    def write():
+        RelatedPost.objects.filter(post_id__in=removed).delete()
+        IndexedPost.objects.filter(post_id__in=pks).delete()
+        IndexedPost.objects.bulk_create(indexed)
+
+    run_write(write)
+
+
+def build_related_posts(full=False):
+    """Пересчитывает похожие посты; возвращает число опубликованных,
+    пересчитанных и убранных из индекса постов."""
+    chunk_size = settings.RELATED_POSTS_CHUNK_SIZE
+    count = settings.RELATED_POSTS_COUNT
+    corpus = Corpus(
+        Post.published.order_by('id').values_list('id', 'title', 'text')
+        .iterator(chunk_size=chunk_size),
+        settings.RELATED_POSTS_MAX_DF,
+    )
+    indexed = dict(IndexedPost.objects.values_list('post_id', 'digest'))
+    removed = (
+        indexed.keys()
+        | set(RelatedPost.objects.order_by()
+              .values_list('post_id', flat=True).distinct())
+    ) - corpus.digests.keys()
+    if full:
+        changed = set(corpus.digests)
+        targets = changed
+    else:
+        changed = {
+            pk for pk, digest in corpus.digests.items()
+            if indexed.get(pk) != digest
+        }
+        targets = affected_posts(corpus, changed, removed, count)
+    for pks in chunks(targets, chunk_size):
+        replace_links(corpus, pks, count)
+    # Отпечатки пишутся последними: прерванный пересчёт повторится.
+    for pks in chunks(changed | removed, chunk_size):
+        replace_digests(corpus, pks)
+    return len(corpus.digests), len(targets), len(removed)
@@ -0,0 +1,52 @@
+"""Заранее отрендеренный HTML текстов постов и комментариев.
+
+``linebreaksbr`` экранирует текст и расставляет переносы на каждом
+просмотре страницы. Готовый HTML хранится в кэше по ключу из объекта и
+отпечатка текста: после правки — в том числе через ``QuerySet.update``
+и в других процессах — ключ меняется, а старая запись истекает сама.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.defaultfilters import linebreaksbr
+from django.utils.functional import cached_property
+from django.utils.safestring import mark_safe
+
+
+def body_html_key(instance):
+    digest = hashlib.blake2b(
+        instance.text.encode(), digest_size=8
+    ).hexdigest()
+    return f'body-html:{instance._meta.model_name}:{instance.pk}:{digest}'
+
+
+def render_body(text):
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def attach_body_html(instances):
+    """Заполняет ``body_html`` у всех объектов одним обращением к кэшу."""
+    keys = {body_html_key(instance): instance for instance in instances}
+    cached = cache.get_many(keys)
+    rendered = {}
+    for key, instance in keys.items():
+        if key not in cached:
+            cached[key] = rendered[key] = render_body(instance.text)
+        instance.__dict__['body_html'] = mark_safe(cached[key])
+    if rendered:
+        cache.set_many(rendered, settings.BODY_HTML_TIMEOUT)
+    return instances
+
+
+class RenderedBodyMixin:
+    """Даёт модели с полем ``text`` атрибут ``body_html``."""
+
+    @cached_property
+    def body_html(self):
+        key = body_html_key(self)
+        html = cache.get(key)
+        if html is None:
+            html = render_body(self.text)
+            cache.set(key, html, settings.BODY_HTML_TIMEOUT)
+        return mark_safe(html)
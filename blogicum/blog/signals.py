@@ -0,0 +1,163 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .counters import invalidate_all_post_counts, invalidate_post_counts
+from .feeds import invalidate_feeds
+from .fragments import post_shell_key
+from .live import publish_comment
+from .models import Category, Comment, Location, Post, User
+from .sitemaps import invalidate_section, invalidate_shards
+
+OWNER_FIELDS = (
+    'category_id', 'author_id', 'category__slug', 'author__username',
+)
+
+
+def delete_in_batches(queryset, batch_size=None):
+    """Удаляет объекты ``queryset`` пачками по первичному ключу,
+    не удерживая блокировку записи надолго. Возвращает число удалённых."""
+    batch_size = batch_size or settings.COMMENTS_BATCH_SIZE
+    deleted = 0
+    while True:
+        batch = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        deleted += queryset.filter(pk__in=batch).delete()[0]
+
+
+def schedule_comments_cleanup(using, **lookup):
+    """Удаляет комментарии удалённого поста или пользователя.
+
+    В общей с ними БД — в той же транзакции, в отдельной — после её
+    фиксации, чтобы откат не оставил пост без комментариев.
+    """
+    cleanup = partial(
+        delete_in_batches, Comment.objects.filter(**lookup)
+    )
+    if router.db_for_write(Comment) == using:
+        cleanup()
+    else:
+        transaction.on_commit(cleanup, using=using)
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_comments(sender, instance, using, **kwargs):
+    schedule_comments_cleanup(using, post_id=instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def delete_author_comments(sender, instance, using, **kwargs):
+    schedule_comments_cleanup(using, author_id=instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_shell(sender, instance, **kwargs):
+    cache.delete(post_shell_key(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post_shell(sender, instance, **kwargs):
+    cache.delete(post_shell_key(instance.post_id))
+
+
+def invalidate_post_shells(post_ids):
+    cache.delete_many([post_shell_key(pk) for pk in post_ids])
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_related_post_shells(sender, instance, **kwargs):
+    """Оболочки постов показывают название категории и места; при
+    удалении посты ищутся до обнуления связи."""
+    field = 'category_id' if sender is Category else 'location_id'
+    invalidate_post_shells(
+        Post.objects.filter(**{field: instance.pk})
+        .values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_post_shells(sender, instance, created,
+                                update_fields=None, **kwargs):
+    """Имя пользователя есть в оболочках его постов и постов с его
+    комментариями."""
+    if created or update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_post_shells(
+        Post.objects.filter(author_id=instance.pk)
+        .values_list('pk', flat=True)
+    )
+    invalidate_post_shells(
+        Comment.objects.filter(author_id=instance.pk).order_by()
+        .values_list('post_id', flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def publish_new_comment(sender, instance, created, using, **kwargs):
+    if created:
+        transaction.on_commit(partial(publish_comment, instance), using=using)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_owners(sender, instance, using, **kwargs):
+    """Запоминает прежние категорию и автора поста: их счётчики и
+    ленты тоже придётся сбросить."""
+    instance._previous_owners = (
+        Post.objects.using(using).filter(pk=instance.pk)
+        .values(*OWNER_FIELDS).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_listings(sender, instance, signal, **kwargs):
+    owners = [getattr(instance, '_previous_owners', None)]
+    if signal is post_save:
+        owners.append({
+            'category_id': instance.category_id,
+            'author_id': instance.author_id,
+            'category__slug': (
+                instance.category.slug if instance.category_id else None
+            ),
+            'author__username': instance.author.username,
+        })
+    owners = [owner for owner in owners if owner]
+    invalidate_post_counts(
+        category_ids={owner['category_id'] for owner in owners},
+        author_ids={owner['author_id'] for owner in owners},
+    )
+    invalidate_feeds(
+        category_slugs={owner['category__slug'] for owner in owners} - {None},
+        usernames={owner['author__username'] for owner in owners},
+    )
+    invalidate_shards('posts', [instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_counters(sender, instance, **kwargs):
+    invalidate_all_post_counts()
+    invalidate_shards('categories', [instance.pk])
+    invalidate_section('posts')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_profile_sitemap(sender, instance, update_fields=None,
+                               **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_shards('profiles', [instance.pk])
@@ -0,0 +1,214 @@
+"""Шардированная карта сайта: посты, категории и профили.
+
+Каждый раздел делится на шарды по диапазонам первичного ключа по
+``SITEMAP_SHARD_SIZE`` (не больше 50 000 URL в файле). Шард пишется в
+файл в ``SITEMAP_CACHE_DIR``: строки читаются пачками по ключу
+(``id > последний``), а не одним ``QuerySet``, и в памяти не
+накапливаются. Файл собирается в самом представлении, до ответа —
+ответ не обращается к БД и под ASGI отдаётся из цикла событий. Запросы
+получают готовый файл, пока он не старше ``SITEMAP_CACHE_TIMEOUT``.
+Сигналы (``blog.signals``) удаляют только файлы шардов с изменившимися
+объектами и кэш индекса.
+
+Отдаются только шарды из индекса, иначе любой запрос создавал бы новый
+файл. Абсолютные адреса строятся от ``SITE_URL``, а не от заголовка
+``Host`` запроса, который первым сгенерировал файл.
+"""
+import os
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+from core.sites import site_url
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
+
+from .models import Category, Post, User
+
+INDEX_KEY = 'sitemap:index'
+
+URLSET_START = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_END = '</urlset>\n'
+
+
+class Section:
+    """Раздел карты сайта: строки ``(id, аргумент URL, lastmod)``."""
+
+    url_name = None
+    fields = ()
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def location(self, row):
+        return reverse(self.url_name, args=[row[1]])
+
+
+class PostSection(Section):
+    url_name = 'blog:post_detail'
+    fields = ('id', 'id', 'pub_date')
+
+    def get_queryset(self):
+        return Post.published.select_related(None)
+
+
+class CategorySection(Section):
+    url_name = 'blog:category_posts'
+    fields = ('id', 'slug', 'created_at')
+
+    def get_queryset(self):
+        return Category.objects.filter(is_published=True)
+
+
+class ProfileSection(Section):
+    url_name = 'blog:profile'
+    fields = ('id', 'username', 'date_joined')
+
+    def get_queryset(self):
+        return User.objects.filter(is_active=True)
+
+
+SECTIONS = {
+    'posts': PostSection(),
+    'categories': CategorySection(),
+    'profiles': ProfileSection(),
+}
+
+
+def shard_of(pk):
+    return (pk - 1) // settings.SITEMAP_SHARD_SIZE
+
+
+def shard_path(section, shard):
+    return os.path.join(
+        settings.SITEMAP_CACHE_DIR, f'sitemap-{section}-{shard}.xml'
+    )
+
+
+def invalidate_shards(section, pks=()):
+    for shard in {shard_of(pk) for pk in pks if pk}:
+        try:
+            os.remove(shard_path(section, shard))
+        except FileNotFoundError:
+            pass
+    cache.delete(INDEX_KEY)
+
+
+def invalidate_section(section):
+    directory = settings.SITEMAP_CACHE_DIR
+    prefix = f'sitemap-{section}-'
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.startswith(prefix):
+                os.remove(os.path.join(directory, name))
+    cache.delete(INDEX_KEY)
+
+
+def shard_rows(section, shard):
+    """Строки шарда пачками по ключу, без загрузки шарда в память."""
+    size = settings.SITEMAP_SHARD_SIZE
+    last, high = shard * size, (shard + 1) * size
+    queryset = section.get_queryset().order_by('id')
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last, id__lte=high)
+            .values_list(*section.fields)[:settings.SITEMAP_BATCH_SIZE]
+        )
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def absolute_url(path):
+    return escape(site_url(path))
+
+
+def shard_chunks(section, shard):
+    yield URLSET_START
+    for rows in shard_rows(section, shard):
+        yield ''.join(
+            '<url><loc>{}</loc><lastmod>{}</lastmod></url>\n'.format(
+                absolute_url(section.location(row)),
+                row[2].isoformat(),
+            )
+            for row in rows
+        )
+    yield URLSET_END
+
+
+def write_to_file(chunks, path):
+    """Пишет ``chunks`` во временный файл рядом с ``path`` и атомарно
+    заменяет им ``path``: параллельные запросы не мешают друг другу."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with open(descriptor, 'w', encoding='utf-8') as file:
+            file.writelines(chunks)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def shard(request, section, number):
+    listed = any(
+        entry[:2] == (section, number) for entry in index_entries()
+    )
+    if not listed:
+        raise Http404('Шард карты сайта не найден')
+    path = shard_path(section, number)
+    try:
+        fresh = (
+            time.time() - os.path.getmtime(path)
+            < settings.SITEMAP_CACHE_TIMEOUT
+        )
+    except FileNotFoundError:
+        fresh = False
+    if not fresh:
+        write_to_file(shard_chunks(SECTIONS[section], number), path)
+    return FileResponse(open(path, 'rb'), content_type='application/xml')
+
+
+def index_entries():
+    entries = cache.get(INDEX_KEY)
+    if entries is None:
+        entries = []
+        for name, section in SECTIONS.items():
+            lastmod_field = section.fields[2]
+            shards = (
+                section.get_queryset().order_by()
+                .annotate(shard=(F('id') - 1) / settings.SITEMAP_SHARD_SIZE)
+                .values('shard')
+                .annotate(lastmod=Max(lastmod_field))
+                .order_by('shard')
+                .values_list('shard', 'lastmod')
+            )
+            entries += [(name, number, lastmod) for number, lastmod in shards]
+        cache.set(INDEX_KEY, entries, settings.SITEMAP_CACHE_TIMEOUT)
+    return entries
+
+
+def index(request):
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex '
+        'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    ]
+    for section, number, lastmod in index_entries():
+        url = absolute_url(
+            reverse('blog:sitemap_shard', args=[section, number])
+        )
+        parts.append(
+            f'<sitemap><loc>{url}</loc>'
+            f'<lastmod>{lastmod.isoformat()}</lastmod></sitemap>\n'
+        )
+    parts.append('</sitemapindex>\n')
+    return StreamingHttpResponse(parts, content_type='application/xml')
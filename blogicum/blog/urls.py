@@ -1,20 +1,31 @@
+from core.aio import read_only_view
 from django.urls import path
 
-from . import views
+from . import api, feeds, live, sitemaps, views
 
 app_name = 'blog'
 
 urlpatterns = [
     path(
         '',
-        views.PostListView.as_view(),
+        read_only_view(views.PostListView.as_view()),
         name='index'
     ),
     path(
         'category/<slug:category_slug>/',
-        views.CategoryPostsView.as_view(),
+        read_only_view(views.CategoryPostsView.as_view()),
         name='category_posts'
     ),
+    path(
+        'cards/',
+        read_only_view(views.PostCardsView.as_view()),
+        name='index_cards'
+    ),
+    path(
+        'category/<slug:category_slug>/cards/',
+        read_only_view(views.CategoryCardsView.as_view()),
+        name='category_cards'
+    ),
 
     path(
         'posts/create/',
@@ -23,9 +34,14 @@ urlpatterns = [
     ),
     path(
         'posts/<int:id>/',
-        views.PostDetailView.as_view(),
+        read_only_view(views.PostDetailView.as_view()),
         name='post_detail'
     ),
+    path(
+        'posts/<int:id>/live/',
+        live.post_live,
+        name='post_live'
+    ),
     path(
         'posts/<int:id>/edit/',
         views.EditPostView.as_view(),
@@ -55,13 +71,105 @@ urlpatterns = [
 
     path(
         'profile/<username>/',
-        views.ProfileView.as_view(),
+        read_only_view(views.ProfileView.as_view()),
         name='profile'
     ),
+    path(
+        'profile/<username>/cards/',
+        read_only_view(views.ProfileCardsView.as_view()),
+        name='profile_cards'
+    ),
     path(
         'profile/edit/<username>/',
         views.EditProfileView.as_view(),
         name='edit_profile'
     ),
 
+    path('feed/', feeds.SiteFeed(), name='feed'),
+    path('feed/atom/', feeds.SiteFeed('atom'), name='feed_atom'),
+    path(
+        'category/<slug:category_slug>/feed/',
+        feeds.CategoryFeed(),
+        name='category_feed'
+    ),
+    path(
+        'category/<slug:category_slug>/feed/atom/',
+        feeds.CategoryFeed('atom'),
+        name='category_feed_atom'
+    ),
+    path(
+        'profile/<username>/feed/',
+        feeds.AuthorFeed(),
+        name='profile_feed'
+    ),
+    path(
+        'profile/<username>/feed/atom/',
+        feeds.AuthorFeed('atom'),
+        name='profile_feed_atom'
+    ),
+
+    path(
+        'archive/<int:year>/',
+        read_only_view(views.PostListView.as_view()),
+        name='index_archive'
+    ),
+    path(
+        'archive/<int:year>/<int:month>/',
+        read_only_view(views.PostListView.as_view()),
+        name='index_archive'
+    ),
+    path(
+        'category/<slug:category_slug>/<int:year>/',
+        read_only_view(views.CategoryPostsView.as_view()),
+        name='category_archive'
+    ),
+    path(
+        'category/<slug:category_slug>/<int:year>/<int:month>/',
+        read_only_view(views.CategoryPostsView.as_view()),
+        name='category_archive'
+    ),
+    path(
+        'profile/<username>/<int:year>/',
+        read_only_view(views.ProfileView.as_view()),
+        name='profile_archive'
+    ),
+    path(
+        'profile/<username>/<int:year>/<int:month>/',
+        read_only_view(views.ProfileView.as_view()),
+        name='profile_archive'
+    ),
+
+    path('sitemap.xml', sitemaps.index, name='sitemap'),
+    path(
+        'sitemap-<slug:section>-<int:number>.xml',
+        sitemaps.shard,
+        name='sitemap_shard'
+    ),
+
+    path(
+        'api/posts/',
+        read_only_view(api.PostListApi.as_view()),
+        name='api_posts'
+    ),
+    path(
+        'api/posts/<int:id>/',
+        read_only_view(api.PostApi.as_view()),
+        name='api_post'
+    ),
+    path(
+        'api/posts/<int:post_id>/comments/',
+        read_only_view(api.CommentListApi.as_view()),
+        name='api_comments'
+    ),
+    path(
+        'api/category/<slug:category_slug>/posts/',
+        read_only_view(api.CategoryPostsApi.as_view()),
+        name='api_category_posts'
+    ),
+    path(
+        'api/profile/<username>/posts/',
+        read_only_view(api.ProfilePostsApi.as_view()),
+        name='api_profile_posts'
+    ),
+
 ]
@@ -1,15 +1,29 @@
+from datetime import date, datetime
+
+import orjson
+from core.fragments import fill_fragments
+from core.paginator import WindowPaginator, after_cursor, encode_cursor
+from core.views import FragmentResponseMixin, TemplateEngineMixin
+from core.writer import run_write
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import transaction
-from django.http import Http404, HttpResponseForbidden
+from django.core.cache import cache
+from django.http import (Http404, HttpResponse, HttpResponseBadRequest,
+                         HttpResponseForbidden)
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.safestring import mark_safe
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
                                   UpdateView)
 
-from .forms import CommentForm, PostForm, ProfileForm
+from .counters import cached_count, cached_months
+from .forms import CommentForm, PostForm, ProfileForm, RegistrationForm
+from .fragments import post_shell_key
 from .models import Category, Comment, Post, User
+from .rendering import attach_body_html
 
 
 class PostMixin:
@@ -27,8 +41,16 @@ class CommentMixin:
     form_class = CommentForm
     template_name = 'include/comments.html'
 
+    def comment_fragment(self, comment, status=200):
+        """Отрендеренный комментарий для ``FragmentResponseMixin``."""
+        html = render_to_string(
+            'includes/comment.html', {'comment': comment},
+            request=self.request,
+        )
+        return self.fragment_response(html, status=status, id=comment.id)
+
 
-class CommentDeleteEditMixin(CommentMixin):
+class CommentDeleteEditMixin(FragmentResponseMixin, CommentMixin):
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
@@ -42,31 +64,166 @@ class CommentDeleteEditMixin(CommentMixin):
         )
 
 
-class ProfileView(ListView):
+def render_cards(request, posts, using=None):
+    """HTML карточек постов — общий для страниц лент и подгрузки."""
+    return mark_safe(render_to_string(
+        'includes/post_cards.html', {'posts': posts}, request=request,
+        using=using,
+    ))
+
+
+class FeedMixin:
+    """Лента постов с пагинацией по кэшированному счётчику
+    (``blog.counters``), окном ссылок вокруг текущей страницы и архивом
+    по месяцам.
+
+    С ``year`` и ``month`` в URL лента ограничивается диапазоном
+    ``pub_date`` и читается по индексу, а не через глубокий ``OFFSET``.
+    Страницы дальше ``FEED_MAX_PAGE`` перенаправляются в архив месяца,
+    в который попадает такая страница. Следующие карточки скрипт
+    страницы подгружает из ``cards_url_name`` по курсору.
+    """
+
+    paginator_class = WindowPaginator
+    paginate_by = settings.POSTS_ON_PAGE
+    archive_url_name = None
+    cards_url_name = None
+
+    def get_feed_queryset(self):
+        raise NotImplementedError
+
+    def get_counter(self):
+        """Область и ключ счётчика ленты, например ``('category', 1)``."""
+        raise NotImplementedError
+
+    def get_archive_args(self):
+        return []
+
+    def get_period(self):
+        year = self.kwargs.get('year')
+        if year is None:
+            return None
+        month = self.kwargs.get('month')
+        if not 1 <= year <= 9998 or month is not None and not 1 <= month <= 12:
+            raise Http404('Страница не найдена')
+        start = timezone.make_aware(datetime(year, month or 1, 1))
+        if month is None or month == 12:
+            end = start.replace(year=start.year + 1, month=1)
+        else:
+            end = start.replace(month=month + 1)
+        return start, end
+
+    def get_queryset(self):
+        self.feed_queryset = self.get_feed_queryset()
+        self.period = self.get_period()
+        if self.period is None:
+            return self.feed_queryset
+        start, end = self.period
+        return self.feed_queryset.filter(
+            pub_date__gte=start, pub_date__lt=end
+        )
+
+    def get_months(self):
+        return cached_months(self.feed_queryset, *self.get_counter())
+
+    def get_post_count(self, queryset):
+        if self.period is None:
+            return cached_count(self.feed_queryset, *self.get_counter())
+        year, month = self.kwargs['year'], self.kwargs.get('month')
+        return sum(
+            count for month_year, month_number, count in self.get_months()
+            if month_year == year and month in (None, month_number)
+        )
+
+    def archive_url(self, year, month):
+        return reverse(
+            self.archive_url_name,
+            args=[*self.get_archive_args(), year, month]
+        )
+
+    def cards_url(self, post):
+        url = reverse(self.cards_url_name, args=self.get_archive_args())
+        return f'{url}?cursor={encode_cursor(post.pub_date, post.id)}'
+
+    def get(self, request, *args, **kwargs):
+        page = request.GET.get('page', '')
+        if (
+            'year' not in kwargs and page.isdigit()
+            and int(page) > settings.FEED_MAX_PAGE
+        ):
+            self.object_list = self.get_queryset()
+            offset = (int(page) - 1) * self.get_paginate_by(self.object_list)
+            for year, month, count in self.get_months():
+                offset -= count
+                if offset < 0:
+                    break
+            else:
+                raise Http404('Страница не найдена')
+            return redirect(self.archive_url(year, month))
+        return super().get(request, *args, **kwargs)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, count=self.get_post_count(queryset),
+            window=settings.PAGINATOR_WINDOW, **kwargs
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context['page_obj']
+        context['page_window'] = page.paginator.page_window(page.number)
+        posts = list(page.object_list)
+        context['cards_html'] = render_cards(
+            self.request, posts, getattr(self, 'template_engine', None)
+        )
+        context['next_cards_url'] = (
+            self.cards_url(posts[-1])
+            if page.has_next() and self.period is None else None
+        )
+        current = self.kwargs.get('year'), self.kwargs.get('month')
+        context['archive_months'] = [
+            {
+                'date': date(year, month, 1),
+                'count': count,
+                'url': self.archive_url(year, month),
+                'current': current == (year, month),
+            }
+            for year, month, count in self.get_months()
+        ]
+        return context
+
+
+class ProfileView(TemplateEngineMixin, FeedMixin, ListView):
     model = Post
+    replica_reads = True
+    cache_anonymous = True
     template_name = 'blog/profile.html'
-    context_object_name = 'page_obj'
-    paginate_by = settings.POSTS_ON_PAGE
     pk_url_kwarg = 'username'
+    archive_url_name = 'blog:profile_archive'
+    cards_url_name = 'blog:profile_cards'
 
-    def get_queryset(self):
-        profile = get_object_or_404(
+    def get_feed_queryset(self):
+        self.profile = get_object_or_404(
             User,
             username=self.kwargs[self.pk_url_kwarg]
         )
-        if self.request.user == profile:
-            return Post.objects.filter(author=profile.id).order_by('-pub_date')
+        if self.request.user == self.profile:
+            posts = Post.objects.filter(author=self.profile.id)
         else:
-            return Post.published.filter(
-                author=profile.id).order_by('-pub_date')
+            posts = Post.published.filter(author=self.profile.id)
+        return posts.order_by('-pub_date', '-id').cards()
+
+    def get_counter(self):
+        if self.request.user == self.profile:
+            return 'author-all', self.profile.pk
+        return 'author', self.profile.pk
+
+    def get_archive_args(self):
+        return [self.profile.username]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        profile = get_object_or_404(
-            User,
-            username=self.kwargs[self.pk_url_kwarg]
-        )
-        context['profile'] = profile
+        context['profile'] = self.profile
         return context
 
 
@@ -80,10 +237,6 @@ class EditProfileView(LoginRequiredMixin, UpdateView):
             return self.request.user
         return None
 
-    def form_valid(self, form):
-        form.save()
-        return super().form_valid(form)
-
     def get_success_url(self):
         if self.request.user.is_authenticated:
             return reverse_lazy(
@@ -97,9 +250,7 @@ class EditProfileView(LoginRequiredMixin, UpdateView):
 class CreatePostView(PostMixin, LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
-        post = form.save(commit=False)
-        post.author = self.request.user
-        post.save()
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -110,26 +261,58 @@ class CreatePostView(PostMixin, LoginRequiredMixin, CreateView):
         )
 
 
-class PostDetailView(PostMixin, DetailView):
+class PostDetailView(TemplateEngineMixin, PostMixin, DetailView):
     template_name = 'blog/post_detail.html'
+    replica_reads = True
+    cache_anonymous = True
 
     def get_object(self, queryset=None):
         post = get_object_or_404(Post, id=self.kwargs[self.pk_url_kwarg])
 
-        if not (post.is_published and post.category.is_published
-                and post.pub_date <= timezone.now()):
+        if not post.is_visible:
             if post.author != self.request.user:
                 raise Http404("Страница не найдена")
 
         return post
 
+    def get(self, request, *args, **kwargs):
+        if not settings.PAGE_SHELLS:
+            return super().get(request, *args, **kwargs)
+        self.object = self.get_object()
+        key = post_shell_key(self.object.pk)
+        shell = cache.get(key)
+        if shell is None:
+            context = self.get_context_data(
+                object=self.object, page_shell=True
+            )
+            shell = self.render_to_response(context).render().content
+            shell = shell.decode()
+            cache.set(key, shell, settings.PAGE_SHELL_TIMEOUT)
+        if not settings.PAGE_SHELL_ESI:
+            return HttpResponse(fill_fragments(request, shell))
+        response = HttpResponse(shell)
+        if self.object.is_visible:
+            patch_cache_control(
+                response, public=True, max_age=settings.PAGE_SHELL_TIMEOUT
+            )
+        return response
+
     def get_context_data(self, **kwargs):
         context = (super().
                    get_context_data(**kwargs))
         context['comments'] = (self.
                                object.comments.all().
-                               order_by('created_at'))
+                               order_by('created_at').
+                               prefetch_related('author'))
+        attach_body_html(context['comments'])
+        context['last_comment_id'] = max(
+            (comment.id for comment in context['comments']), default=0
+        )
         context['form'] = CommentForm()
+        context['related_posts'] = (
+            Post.published.filter(linked_from__post=self.object)
+            .order_by('linked_from__rank').cards()
+        )
         return context
 
 
@@ -145,8 +328,7 @@ class DeletePostView(PostMixin, LoginRequiredMixin, DeleteView):
         instance = self.get_object()
         if instance.author != request.user:
             return redirect('blog:post_detail', id=instance.id)
-        with transaction.atomic():
-            instance.delete()
+        run_write(instance.delete)
         return redirect(self.get_success_url())
 
 
@@ -167,7 +349,12 @@ class EditPostView(PostMixin, LoginRequiredMixin, UpdateView):
         )
 
 
-class AddCommentView(CommentMixin, LoginRequiredMixin, CreateView):
+class AddCommentView(
+    FragmentResponseMixin,
+    CommentMixin,
+    LoginRequiredMixin,
+    CreateView
+):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -179,15 +366,21 @@ class AddCommentView(CommentMixin, LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         post = get_object_or_404(Post, id=self.kwargs['post_id'])
-        comment = form.save(commit=False)
-        comment.post = post
-        comment.author = self.request.user
-        comment.save()
+        form.instance.post = post
+        form.instance.author = self.request.user
+        comment = form.save()
+        if self.fragment_format:
+            return self.comment_fragment(comment, status=201)
         return redirect(
             'blog:post_detail',
             id=post.id
         )
 
+    def form_invalid(self, form):
+        if self.fragment_format:
+            return self.fragment_errors(form)
+        return super().form_invalid(form)
+
 
 class EditCommentView(
     CommentDeleteEditMixin,
@@ -203,6 +396,16 @@ class EditCommentView(
             )
         return super().dispatch(request, *args, **kwargs)
 
+    def form_valid(self, form):
+        if self.fragment_format:
+            return self.comment_fragment(form.save())
+        return super().form_valid(form)
+
+    def form_invalid(self, form):
+        if self.fragment_format:
+            return self.fragment_errors(form)
+        return super().form_invalid(form)
+
 
 class DeleteCommentView(
     CommentDeleteEditMixin,
@@ -213,8 +416,13 @@ class DeleteCommentView(
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
         if instance.author != request.user:
+            if self.fragment_format:
+                return HttpResponseForbidden()
             return redirect('blog:post_detail', id=self.kwargs['post_id'])
-        instance.delete()
+        comment_id = instance.id
+        run_write(instance.delete, using=instance._state.db)
+        if self.fragment_format:
+            return self.fragment_response(id=comment_id, deleted=True)
         return redirect(self.get_success_url())
 
 
@@ -229,36 +437,96 @@ class PostCreateView(
         return super().form_valid(form)
 
 
-class PostListView(ListView):
+class PostListView(TemplateEngineMixin, FeedMixin, ListView):
     model = Post
+    replica_reads = True
+    cache_anonymous = True
     template_name = 'blog/index.html'
-    queryset = Post.published.select_related('author')
-    ordering = ('-pub_date')
-    paginate_by = settings.POSTS_ON_PAGE
+    archive_url_name = 'blog:index_archive'
+    cards_url_name = 'blog:index_cards'
+
+    def get_feed_queryset(self):
+        return Post.published.select_related('author').cards().order_by(
+            '-pub_date', '-id'
+        )
+
+    def get_counter(self):
+        return 'published', None
 
 
-class CategoryPostsView(ListView):
+class CategoryPostsView(TemplateEngineMixin, FeedMixin, ListView):
     model = Post
+    replica_reads = True
+    cache_anonymous = True
     template_name = 'blog/category.html'
-    context_object_name = 'page_obj'
-    paginate_by = settings.POSTS_ON_PAGE
     slug_url_kwarg = 'category_slug'
+    archive_url_name = 'blog:category_archive'
+    cards_url_name = 'blog:category_cards'
 
-    def get_queryset(self):
-        category = get_object_or_404(
+    def get_feed_queryset(self):
+        self.category = get_object_or_404(
             Category,
             slug=self.kwargs[self.slug_url_kwarg],
             is_published=True
         )
         return (Post.published.filter(
-            category=category).order_by('-pub_date'))
+            category=self.category).order_by('-pub_date', '-id').cards())
+
+    def get_counter(self):
+        return 'category', self.category.pk
+
+    def get_archive_args(self):
+        return [self.category.slug]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        category = get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True
-        )
-        context['category'] = category
+        context['category'] = self.category
         return context
+
+
+class FeedCardsMixin:
+    """Следующая пачка карточек ленты после курсора: ``{html, next}``.
+
+    Ответ для анонимов кэшируется общим кэшем отдельно для каждого
+    курсора (``cache_anonymous`` ленты).
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            queryset = after_cursor(
+                self.get_feed_queryset(), 'pub_date',
+                request.GET.get('cursor'),
+            )
+        except ValueError:
+            return HttpResponseBadRequest('Неверный курсор')
+        size = self.get_paginate_by(queryset)
+        posts = list(queryset[:size + 1])
+        next_url = None
+        if len(posts) > size:
+            next_url = self.cards_url(posts[size - 1])
+        return HttpResponse(
+            orjson.dumps({
+                'html': render_cards(request, posts[:size],
+                                     self.template_engine),
+                'next': next_url,
+            }),
+            content_type='application/json',
+        )
+
+
+class PostCardsView(FeedCardsMixin, PostListView):
+    pass
+
+
+class CategoryCardsView(FeedCardsMixin, CategoryPostsView):
+    pass
+
+
+class ProfileCardsView(FeedCardsMixin, ProfileView):
+    pass
+
+
+class RegistrationView(CreateView):
+    template_name = 'registration/registration_form.html'
+    form_class = RegistrationForm
+    success_url = reverse_lazy('blog:index')
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
+from core.templating import warm_templates
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+os.environ.setdefault('BLOGICUM_ASYNC_VIEWS', '1')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Модели импортируются только после настройки Django.
+from blog.live import LiveCommentsMiddleware  # noqa: E402
+
+application = LiveCommentsMiddleware(django_application)
+
+if settings.TEMPLATE_CACHE:
+    warm_templates()
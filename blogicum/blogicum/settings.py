@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -30,6 +31,10 @@ ALLOWED_HOSTS = [
     '127.0.0.1',
 ]
 
+# Адрес сайта для абсолютных ссылок, которые сохраняются и отдаются
+# всем (карта сайта), — вместо заголовка Host случайного запроса.
+SITE_URL = os.getenv('BLOGICUM_SITE_URL', 'http://localhost:8000')
+
 
 # Application definition
 
@@ -48,10 +53,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.AnonymousCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -60,41 +67,169 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+# Скомпилированные шаблоны кэшируются на всё время жизни процесса и
+# компилируются заранее при старте воркера (core.templating). Включено
+# всегда при DEBUG = False, для отладки — BLOGICUM_TEMPLATE_CACHE=1.
+TEMPLATE_CACHE = not DEBUG or os.getenv('BLOGICUM_TEMPLATE_CACHE') == '1'
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         # Указываем, в каких директориях искать HTML-шаблоны.
         'DIRS': [TEMPLATES_DIR],
-
-        # Оставляем True: шаблоны приложений будут искаться
-        # не только на уровне проекта, но и в директориях приложений.
-        # Это необходимо для работы
-        # встроенных приложений (например админки).
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-            ]
+            ],
+            # Загрузчик из директорий приложений нужен встроенным
+            # приложениям (например, админке).
+            'loaders': (
+                [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+                if TEMPLATE_CACHE else TEMPLATE_LOADERS
+            ),
         },
     }
 ]
 
+# Шаблоны, которые рендерит Jinja2 (core.jinja) из JINJA2_DIR вместо
+# шаблонизатора Django, например:
+# BLOGICUM_JINJA2_TEMPLATES=blog/index.html,blog/post_detail.html
+JINJA2_TEMPLATES = {
+    name for name in os.getenv('BLOGICUM_JINJA2_TEMPLATES', '').split(',')
+    if name
+}
+
+JINJA2_DIR = BASE_DIR / 'jinja2'
+
+JINJA2_ENGINE = {
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'DIRS': [JINJA2_DIR],
+    'OPTIONS': {
+        'environment': 'core.jinja.environment',
+        'context_processors': [
+            'django.contrib.auth.context_processors.auth',
+            'django.contrib.messages.context_processors.messages',
+        ],
+    },
+}
+
+if JINJA2_TEMPLATES:
+    TEMPLATES.append(JINJA2_ENGINE)
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
+# Профиль БД выбирается переменной окружения BLOGICUM_DATABASE_PROFILE.
+# production: WAL, mmap, busy timeout и постоянные соединения.
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+# Журнал переключает только писатель, реплика открывается на чтение.
+SQLITE_READ_ONLY_PRAGMAS = {
+    name: value
+    for name, value in SQLITE_PRODUCTION_PRAGMAS.items()
+    if name != 'journal_mode'
+}
+
+DATABASE_PROFILES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    'production': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'PRAGMAS': SQLITE_PRODUCTION_PRAGMAS,
+        'TRANSACTION_MODE': 'IMMEDIATE',
+    },
 }
 
+DATABASE_PROFILE = os.getenv('BLOGICUM_DATABASE_PROFILE', 'default')
+
+DATABASES = {
+    'default': DATABASE_PROFILES[DATABASE_PROFILE],
+}
+
+# Алиас только для чтения: GET-запросы к представлениям с
+# replica_reads = True читают отсюда (core.routers.ReplicaRouter).
+REPLICA_DATABASE = 'replica'
+
+if DATABASE_PROFILE == 'production':
+    DATABASES[REPLICA_DATABASE] = {
+        **DATABASES['default'],
+        'NAME': f"{(BASE_DIR / 'db.sqlite3').as_uri()}?mode=ro",
+        'PRAGMAS': SQLITE_READ_ONLY_PRAGMAS,
+        'TRANSACTION_MODE': 'DEFERRED',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Комментарии можно вынести в отдельный файл БД, чтобы их запись не
+# блокировала ленту: BLOGICUM_COMMENTS_DATABASE=1, затем
+# python manage.py migrate --database=comments и
+# python manage.py move_comments [--delete] — иначе комментарии, оставшиеся
+# в основной БД, перестанут показываться.
+COMMENTS_DATABASE = 'comments'
+
+COMMENTS_DATABASE_MODELS = {'blog.comment'}
+
+if os.getenv('BLOGICUM_COMMENTS_DATABASE') == '1':
+    DATABASES[COMMENTS_DATABASE] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / 'comments.sqlite3',
+    }
+
+DATABASE_ROUTERS = [
+    'core.routers.CommentsRouter',
+    'core.routers.ReplicaRouter',
+]
+
+# Размер пачки при удалении и проверке комментариев между БД.
+COMMENTS_BATCH_SIZE = 500
+
+# Записи выполняются по очереди в одном потоке на файл БД (core.writer).
+SERIALIZED_WRITES = os.getenv('BLOGICUM_SERIALIZED_WRITES') == '1'
+
+WRITE_RETRY_ATTEMPTS = 5
+
+# Базовая задержка (в секундах) перед повтором заблокированной записи.
+WRITE_RETRY_BACKOFF = 0.05
+
+WRITE_QUEUE_TIMEOUT = 30
+
+# Read-only представления как асинхронные (core.aio): asgi.py включает
+# их сам. ORM и шаблоны выполняются в пуле из ASYNC_VIEW_THREADS
+# потоков — он же ограничивает число соединений с БД на процесс.
+ASYNC_VIEWS = os.getenv('BLOGICUM_ASYNC_VIEWS') == '1'
+
+ASYNC_VIEW_THREADS = int(os.getenv('BLOGICUM_ASYNC_VIEW_THREADS', '8'))
+
+# Живая лента комментариев (blog.live): раз в сколько секунд простаивающее
+# соединение получает keepalive, сколько событий ждёт отставшего клиента
+# и через сколько миллисекунд браузер переподключается.
+LIVE_COMMENTS_KEEPALIVE = 15
+
+LIVE_COMMENTS_QUEUE_SIZE = 100
+
+LIVE_COMMENTS_RETRY = 5000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -138,6 +273,18 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static_collected'
+
+# Хэшированные имена и gzip-копии статики создаются при collectstatic.
+if os.getenv('BLOGICUM_STATIC_MANIFEST') == '1':
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Приложение само отдаёт собранную статику (core.static.serve),
+# файлы с хэшем в имени — с Cache-Control: immutable на год.
+SERVE_STATIC = os.getenv('BLOGICUM_SERVE_STATIC') == '1'
+
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -145,6 +292,52 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 POSTS_ON_PAGE = 10
 
+# Сколько объектов отдаёт одна страница JSON API (blog.api).
+API_PAGE_SIZE = 20
+
+# Сколько ссылок на страницы показывать по обе стороны от текущей.
+PAGINATOR_WINDOW = 3
+
+# Сколько последних постов попадает в RSS/Atom-ленты (blog.feeds) и
+# сколько секунд лента хранится в кэше без изменений постов.
+FEED_ITEMS = 20
+
+FEED_CACHE_TIMEOUT = 60 * 60
+
+# Более глубокие страницы лент перенаправляются в архив по месяцам.
+FEED_MAX_PAGE = 20
+
+# Сколько секунд живут кэшированные счётчики постов лент (blog.counters).
+POST_COUNT_TIMEOUT = 5 * 60
+
+# Карта сайта (blog.sitemaps): сколько URL в одном шарде (не больше
+# 50 000 по протоколу), сколько строк читается за запрос, где хранятся
+# готовые шарды и сколько секунд живут индекс и файлы шардов.
+SITEMAP_SHARD_SIZE = 50_000
+
+SITEMAP_BATCH_SIZE = 1000
+
+SITEMAP_CACHE_DIR = BASE_DIR / 'sitemap_cache'
+
+SITEMAP_CACHE_TIMEOUT = 60 * 60
+
+# Похожие посты (blog.related): сколько хранить на пост, по сколько
+# постов пересчитывать за раз (матрица сходства пачки занимает
+# RELATED_POSTS_CHUNK_SIZE × число постов × 4 байта) и в какой доле
+# постов термин считается стоп-словом.
+RELATED_POSTS_COUNT = 5
+
+RELATED_POSTS_CHUNK_SIZE = 256
+
+RELATED_POSTS_MAX_DF = 0.5
+
+# Сколько слов текста хранится в анонсе поста (Post.excerpt).
+POST_EXCERPT_WORDS = 10
+
+# Сколько секунд кэш хранит HTML текстов постов и комментариев
+# (blog.rendering); при правке запись удаляется сразу.
+BODY_HTML_TIMEOUT = 7 * 24 * 60 * 60
+
 MAX_SELF_COMMENT_LENGTH = 100
 
 MAX_LENGTH = 256
@@ -161,4 +354,81 @@ LOGIN_URL = 'login'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Кто передаёт файлы из MEDIA_ROOT (core.media): django — FileResponse с
+# поддержкой Range и ETag; x-accel-redirect — nginx; x-sendfile — Apache.
+MEDIA_SERVING = os.getenv('BLOGICUM_MEDIA_SERVING', 'django')
+
+# Внутренний location nginx, указывающий на MEDIA_ROOT.
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Файлы моложе этого срока (в секундах) сборщик мусора не удаляет:
+# загрузка могла ещё не дойти до сохранения поста.
+MEDIA_GC_GRACE_PERIOD = 24 * 60 * 60
+
+# Где collect_media_garbage хранит позицию незавершённого обхода.
+MEDIA_GC_STATE_FILE = BASE_DIR / '.media_gc_state'
+
+# Загрузки пишутся во временные файлы по мере чтения запроса
+# (core.uploads); файлы больше FILE_UPLOAD_MAX_BYTES форма отклоняет.
+FILE_UPLOAD_HANDLERS = ['core.uploads.BoundedTemporaryFileUploadHandler']
+
+FILE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+# Изображения с большим числом пикселей отклоняются по заголовку файла.
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+
+# Принятые изображения перекодируются без EXIF с длинной стороной не
+# больше IMAGE_MAX_DIMENSION в пуле из IMAGE_WORKERS процессов
+# (0 — в процессе запроса).
+IMAGE_MAX_DIMENSION = 2048
+
+IMAGE_WORKERS = int(os.getenv('BLOGICUM_IMAGE_WORKERS', '2'))
+
+IMAGE_PROCESSING_TIMEOUT = 60
+
+# Общий для всех процессов кэш: сигналы сбрасывают оболочки страниц,
+# счётчики и ленты во всех воркерах сразу. По умолчанию — файлы на
+# диске одного хоста; для нескольких хостов, например,
+# BLOGICUM_CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache
+# и BLOGICUM_CACHE_LOCATION=127.0.0.1:11211.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'BLOGICUM_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.getenv(
+            'BLOGICUM_CACHE_LOCATION', str(BASE_DIR / 'cache')
+        ),
+    }
+}
+
+# Сессии читаются из кэша, а не из БД на каждом запросе. Для хранения
+# сессии целиком в подписанной cookie:
+# BLOGICUM_SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies
+SESSION_ENGINE = os.getenv(
+    'BLOGICUM_SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+# Сколько секунд общий кэш может хранить страницы для анонимов
+# (core.middleware.AnonymousCacheMiddleware).
+ANONYMOUS_CACHE_TIMEOUT = 60
+
+# Оболочка страницы поста кэшируется одна на URL, а персональные
+# фрагменты (core.fragments) подставляются для каждого запроса —
+# сервером или, при BLOGICUM_PAGE_SHELL_ESI=1, прокси через ESI.
+PAGE_SHELLS = os.getenv('BLOGICUM_PAGE_SHELLS') == '1'
+
+PAGE_SHELL_ESI = os.getenv('BLOGICUM_PAGE_SHELL_ESI') == '1'
+
+PAGE_SHELL_TIMEOUT = 300
+
+# Заголовок, с которым скрипты страницы получают вместо редиректа
+# только изменённый комментарий: html или json (core.views,
+# includes/comments_script.html).
+FRAGMENT_HEADER = 'X-Fragment'
+
 INTERNAL_IPS = ['127.0.0.1', ]
@@ -0,0 +1,74 @@
+"""Асинхронные варианты read-only представлений для ASGI.
+
+Под ASGI Django 3.2 выполняет синхронные представления в одном общем
+потоке, а медленные клиенты держат воркер до конца передачи ответа.
+``async_view`` оборачивает синхронное представление: ORM и рендеринг
+шаблона выполняются в пуле из ``ASYNC_VIEW_THREADS`` потоков (он же
+ограничивает число соединений с БД), а отдача ответа остаётся в
+цикле событий — обработчик ASGI передаёт тело частями и ждёт клиента
+через ``await``, не занимая потоков.
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from django.conf import settings
+from django.db import connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_VIEW_THREADS,
+                thread_name_prefix='async-view',
+            )
+    return _executor
+
+
+def call_and_close(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # request_finished закрывает соединения только в своём потоке.
+        for connection in connections.all():
+            connection.close_if_unusable_or_obsolete()
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """Выполняет ``func`` в пуле потоков с контекстом текущей задачи."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(),
+        partial(context.run, call_and_close, func, *args, **kwargs),
+    )
+
+
+def render_view(view, request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    if callable(getattr(response, 'render', None)):
+        response = response.render()
+    return response
+
+
+def async_view(view):
+    """Асинхронный вариант синхронного представления ``view``.
+
+    Атрибуты ``view`` (``view_class``, ``csrf_exempt``) сохраняются,
+    поэтому middleware видит те же флаги представления.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run_in_pool(render_view, view, request, *args, **kwargs)
+    return wrapper
+
+
+def read_only_view(view):
+    """``async_view`` при ``ASYNC_VIEWS``, иначе исходное представление."""
+    return async_view(view) if settings.ASYNC_VIEWS else view
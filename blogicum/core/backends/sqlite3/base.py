@@ -0,0 +1,25 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с настраиваемыми PRAGMA и режимом открытия транзакций.
+
+    Дополнительные ключи в ``settings.DATABASES``:
+
+    * ``PRAGMAS`` — словарь ``{имя: значение}``, применяется к каждому
+      новому соединению;
+    * ``TRANSACTION_MODE`` — ``DEFERRED`` (по умолчанию), ``IMMEDIATE``
+      или ``EXCLUSIVE``. ``IMMEDIATE`` захватывает блокировку записи
+      в начале ``atomic()`` и избавляет от ``database is locked`` при
+      повышении блокировки чтения до записи.
+    """
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get('PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get('TRANSACTION_MODE', 'DEFERRED')
+        self.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,57 @@
+"""Персональные фрагменты страниц («дырки» в кэшируемой оболочке).
+
+Оболочка страницы рендерится без данных пользователя: вместо каждого
+персонального фрагмента в неё попадает метка. Метки заполняются
+``fill_fragments`` для текущего запроса или, при ``PAGE_SHELL_ESI``,
+обратным прокси через ``<esi:include>`` на ``core:fragment``.
+"""
+import re
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+
+PLACEHOLDER = re.compile(r'<!--fragment:(?P<name>\w+):(?P<args>[\w,-]*)-->')
+
+_registry = {}
+
+
+def register(name):
+    """Регистрирует функцию ``(request, *args) -> str`` как фрагмент."""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def is_registered(name):
+    return name in _registry
+
+
+def render_fragment(request, name, *args):
+    return _registry[name](request, *args)
+
+
+def placeholder(name, *args):
+    args = ','.join(str(arg) for arg in args)
+    if settings.PAGE_SHELL_ESI:
+        url = reverse('core:fragment', args=[name])
+        return format_html(
+            '<esi:include src="{}?{}"/>', url, urlencode({'args': args})
+        )
+    return mark_safe(f'<!--fragment:{name}:{args}-->')
+
+
+def split_args(args):
+    return [arg for arg in args.split(',') if arg]
+
+
+def fill_fragments(request, shell):
+    return PLACEHOLDER.sub(
+        lambda match: render_fragment(
+            request, match['name'], *split_args(match['args'])
+        ),
+        shell,
+    )
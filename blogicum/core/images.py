@@ -0,0 +1,150 @@
+"""Проверка и перекодирование загружаемых изображений.
+
+Форма сначала сверяет размер файла с ``FILE_UPLOAD_MAX_BYTES`` и по
+заголовку, без декодирования пикселей, — число пикселей с
+``IMAGE_UPLOAD_MAX_PIXELS``. Принятое изображение перекодируется в
+отдельном процессе (``IMAGE_WORKERS``): EXIF удаляется, длинная сторона
+уменьшается до ``IMAGE_MAX_DIMENSION``. Так память процесса, который
+обслуживает запрос, не растёт вместе с размером фотографии.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageOps
+
+# Форматы, которые Pillow открывает, но сохраняет под другим именем.
+SAVE_AS = {'MPO': 'JPEG'}
+SAVE_FORMATS = {
+    'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp',
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def read_dimensions(file):
+    """Ширина и высота из заголовка файла, пиксели не декодируются."""
+    with Image.open(file) as image:
+        return image.size
+
+
+def reencode_image(source, target, max_dimension):
+    """Сохраняет в ``target`` копию ``source`` без метаданных, вписанную
+    в квадрат ``max_dimension``. Возвращает формат и размеры копии."""
+    with Image.open(source) as original:
+        image_format = SAVE_AS.get(original.format, original.format)
+        if image_format not in SAVE_FORMATS:
+            image_format = 'PNG'
+        # JPEG декодируется сразу в уменьшенном масштабе.
+        original.draft('RGB', (max_dimension, max_dimension))
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail((max_dimension, max_dimension))
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(target, format=image_format)
+        return image_format, image.size
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def temporary_path(upload):
+    """Путь к содержимому загрузки; файлы из памяти сначала
+    сбрасываются на диск."""
+    if hasattr(upload, 'temporary_file_path'):
+        return upload.temporary_file_path(), None
+    copy = tempfile.NamedTemporaryFile(
+        suffix='.upload', dir=settings.FILE_UPLOAD_TEMP_DIR
+    )
+    upload.seek(0)
+    shutil.copyfileobj(upload, copy)
+    copy.flush()
+    return copy.name, copy
+
+
+def reencode_upload(upload):
+    """Возвращает перекодированную копию загрузки как
+    ``TemporaryUploadedFile``."""
+    source, source_copy = temporary_path(upload)
+    result = TemporaryUploadedFile(upload.name, None, 0, None)
+    args = (
+        source, result.temporary_file_path(), settings.IMAGE_MAX_DIMENSION
+    )
+    try:
+        if settings.IMAGE_WORKERS:
+            image_format, _ = get_pool().submit(reencode_image, *args).result(
+                timeout=settings.IMAGE_PROCESSING_TIMEOUT
+            )
+        else:
+            image_format, _ = reencode_image(*args)
+    finally:
+        if source_copy is not None:
+            source_copy.close()
+    stem, extension = os.path.splitext(upload.name)
+    if extension.lower() not in {'.jpeg', SAVE_FORMATS[image_format]}:
+        result.name = stem + SAVE_FORMATS[image_format]
+    result.content_type = Image.MIME[image_format]
+    result.size = os.path.getsize(result.temporary_file_path())
+    return result
+
+
+class BoundedImageField(forms.ImageField):
+    """``ImageField``, который отклоняет слишком большие файлы и
+    изображения до того, как Pillow начнёт их декодировать."""
+
+    default_error_messages = {
+        'file_too_large': 'Файл больше %(limit)s.',
+        'image_too_large': (
+            'Изображение слишком большое: %(width)s×%(height)s пикселей.'
+        ),
+    }
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return None
+        limit = settings.FILE_UPLOAD_MAX_BYTES
+        if data.size > limit:
+            raise forms.ValidationError(
+                self.error_messages['file_too_large'],
+                code='file_too_large',
+                params={'limit': filesizeformat(limit)},
+            )
+        self.check_dimensions(data)
+        return super().to_python(data)
+
+    def check_dimensions(self, data):
+        path = getattr(data, 'temporary_file_path', None)
+        try:
+            width, height = read_dimensions(path() if path else data)
+        except Image.DecompressionBombError:
+            raise self.image_too_large('?', '?')
+        except Exception:
+            # Нечитаемый файл отклонит проверка родительского класса.
+            return
+        finally:
+            data.seek(0)
+        if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+            raise self.image_too_large(width, height)
+
+    def image_too_large(self, width, height):
+        return forms.ValidationError(
+            self.error_messages['image_too_large'],
+            code='image_too_large',
+            params={'width': width, 'height': height},
+        )
@@ -0,0 +1,49 @@
+"""Окружение Jinja2 для шаблонов из ``JINJA2_TEMPLATES``.
+
+Помощники повторяют теги и фильтры Django, которыми пользуются
+шаблоны ленты и поста: ``url``, ``static``, ``fragment``,
+``bootstrap_css`` и фильтры ``date``, ``truncatewords``, ``linebreaksbr``.
+"""
+from functools import partial
+
+from django.template import defaultfilters
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.timezone import template_localtime
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+from jinja2 import Environment, pass_context
+
+from .fragments import placeholder, render_fragment
+
+
+def url(viewname, *args, **kwargs):
+    return reverse(viewname, args=args, kwargs=kwargs)
+
+
+def date(value, arg=None):
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+@pass_context
+def fragment(context, name, *args):
+    if context.get('page_shell'):
+        return placeholder(name, *args)
+    return render_fragment(context['request'], name, *args)
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({
+        'url': url,
+        'static': static,
+        'fragment': fragment,
+        'bootstrap_css': bootstrap_css,
+    })
+    env.filters.update({
+        'date': date,
+        'truncatewords': defaultfilters.truncatewords,
+        # По умолчанию фильтр Django не экранирует текст, но помечает
+        # результат безопасным.
+        'linebreaksbr': partial(defaultfilters.linebreaksbr, autoescape=True),
+    })
+    return env
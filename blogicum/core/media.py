@@ -0,0 +1,141 @@
+"""Отдача загруженных файлов из ``MEDIA_ROOT``.
+
+Режим задаёт ``MEDIA_SERVING``:
+
+* ``x-accel-redirect`` — передать отдачу nginx через внутренний
+  location ``MEDIA_ACCEL_PREFIX``::
+
+      location /protected-media/ {
+          internal;
+          alias /path/to/media/;
+      }
+
+* ``x-sendfile`` — передать отдачу Apache (mod_xsendfile) или lighttpd;
+* ``django`` — отдать самостоятельно через ``FileResponse`` с
+  поддержкой ``Range``, ``ETag`` и ``If-Modified-Since``. WSGI-сервер с
+  ``wsgi.file_wrapper`` (например, gunicorn) передаёт такой файл через
+  ``sendfile`` без копирования в процесс.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+
+
+class FileRange:
+    """Файл, читаемый только в пределах ``[start, start + length)``.
+
+    Сохраняет ``fileno()``, чтобы сервер мог отдать диапазон через
+    ``sendfile`` с текущей позиции на ``Content-Length`` байт.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Возвращает ``(start, end)`` включительно, ``None`` для
+    игнорируемого заголовка или ``False`` для невыполнимого диапазона.
+    Несколько диапазонов не поддерживаются: отдаётся весь файл."""
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None
+    start, end = match['start'], match['end']
+    if not start:
+        if not end:
+            return None
+        length = min(int(end), size)
+        return (size - length, size - 1) if length else False
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return False
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    if_range = request.headers.get('If-Range')
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def offloaded_response(path, full_path, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SERVING == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = quote(
+            f'{settings.MEDIA_ACCEL_PREFIX}{path}'
+        )
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+def serve(request, path):
+    full_path = safe_join(settings.MEDIA_ROOT, path)
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден')
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    if settings.MEDIA_SERVING != 'django':
+        return offloaded_response(path, full_path, content_type)
+
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if not_modified is not None:
+        return not_modified
+
+    byte_range = None
+    if 'Range' in request.headers and if_range_matches(
+        request, etag, stat.st_mtime
+    ):
+        byte_range = parse_range(request.headers['Range'], stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(file, start, end - start + 1),
+            content_type=content_type,
+            status=206,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
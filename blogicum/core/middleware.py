@@ -0,0 +1,125 @@
+import asyncio
+from http import HTTPStatus
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+
+from .routers import activate_replica_reads, deactivate_replica_reads
+
+
+class HybridMiddleware:
+    """Основа middleware, работающего и под WSGI, и под ASGI.
+
+    Без неё Django 3.2 под ASGI вызывал бы цепочку ниже через общий
+    синхронный поток. ``process_view`` не обращается к БД, поэтому в
+    асинхронном стеке выполняется прямо в цикле событий и в контексте
+    запроса.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view = self.async_process_view
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    async def async_process_view(self, request, *args):
+        return type(self).process_view(self, request, *args)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        return None
+
+    def process_response(self, request, response):
+        return response
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """Включает чтение из реплики для безопасных запросов к
+    представлениям с атрибутом ``replica_reads = True``."""
+
+    def process_response(self, request, response):
+        token = getattr(request, '_replica_token', None)
+        if token is not None:
+            deactivate_replica_reads(token)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', view_func)
+        if (request.method in ('GET', 'HEAD')
+                and getattr(view_class, 'replica_reads', False)):
+            request._replica_token = activate_replica_reads()
+
+
+class AnonymousCacheMiddleware(HybridMiddleware):
+    """Делает страницы для анонимов кэшируемыми общим кэшем.
+
+    Ответ представления с ``cache_anonymous = True`` на GET/HEAD без
+    cookie сессии и сообщений получает ``Cache-Control: public`` с
+    ``ANONYMOUS_CACHE_TIMEOUT``, а ``Cookie`` убирается из ``Vary``:
+    такой ответ от cookie не зависит. Ответы на запросы с cookie сессии
+    помечаются ``private``, заданный представлением ``Cache-Control`` не
+    меняется. Обратный прокси не должен кэшировать запросы
+    с cookie сессии, например в nginx::
+
+        proxy_cache_bypass $cookie_sessionid;
+        proxy_no_cache $cookie_sessionid;
+
+    Должен стоять в ``MIDDLEWARE`` выше ``SessionMiddleware``.
+    """
+
+    personal_cookies = ('messages',)
+
+    def process_response(self, request, response):
+        if response.has_header('Cache-Control'):
+            return response
+        if self.is_public(request, response):
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=settings.ANONYMOUS_CACHE_TIMEOUT,
+            )
+            remove_vary_cookie(response)
+        elif settings.SESSION_COOKIE_NAME in request.COOKIES:
+            patch_cache_control(response, private=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', view_func)
+        request._cache_anonymous = (
+            request.method in ('GET', 'HEAD')
+            and getattr(view_class, 'cache_anonymous', False)
+        )
+
+    def is_public(self, request, response):
+        cookies = (settings.SESSION_COOKIE_NAME, *self.personal_cookies)
+        return (
+            getattr(request, '_cache_anonymous', False)
+            and response.status_code == HTTPStatus.OK
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+            and not any(name in request.COOKIES for name in cookies)
+        )
+
+
+def remove_vary_cookie(response):
+    if not response.has_header('Vary'):
+        return
+    headers = [
+        header.strip() for header in response['Vary'].split(',')
+        if header.strip().lower() != 'cookie'
+    ]
+    if headers:
+        response['Vary'] = ', '.join(headers)
+    else:
+        del response['Vary']
@@ -0,0 +1,64 @@
+import base64
+import binascii
+
+import orjson
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+def encode_cursor(value, pk):
+    """Непрозрачный курсор по ``(дата, id)`` последнего объекта."""
+    payload = orjson.dumps([value.isoformat(), pk])
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor):
+    """``(дата, id)`` из курсора; ``ValueError``, если курсор испорчен."""
+    try:
+        value, pk = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value = parse_datetime(value)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+        value = pk = None
+    if value is None or not isinstance(pk, int):
+        raise ValueError('Неверный курсор')
+    return value, pk
+
+
+def after_cursor(queryset, field, cursor, descending=True):
+    """Объекты ``queryset`` после ``cursor`` в порядке ``(field, id)``."""
+    lookup = 'lt' if descending else 'gt'
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{field}__{lookup}': value})
+            | Q(**{field: value, f'id__{lookup}': pk})
+        )
+    prefix = '-' if descending else ''
+    return queryset.order_by(f'{prefix}{field}', f'{prefix}id')
+
+
+class WindowPaginator(Paginator):
+    """Пагинатор с заранее известным числом объектов и окном ссылок.
+
+    ``count`` передаётся снаружи (например, из кэшированного счётчика),
+    и ``COUNT(*)`` не выполняется. ``page_window`` возвращает номера
+    страниц вокруг текущей и по краям, пропуски — ``ELLIPSIS``.
+    """
+
+    def __init__(self, *args, count=None, window=3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._count = count
+        self.window = window
+
+    @cached_property
+    def count(self):
+        if self._count is not None:
+            return self._count
+        return super().count
+
+    def page_window(self, number):
+        return list(self.get_elided_page_range(
+            number, on_each_side=self.window, on_ends=1
+        ))
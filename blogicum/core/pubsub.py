@@ -0,0 +1,74 @@
+"""Публикация событий подписчикам внутри процесса.
+
+Подписчики — асинхронные потоки ответов (например, SSE) в цикле событий
+ASGI-воркера, публикация — из любого потока: представления, пула
+``core.aio`` или потока-писателя ``core.writer``. Одно событие
+передаётся в каждый цикл событий одним ``call_soon_threadsafe`` и там
+раскладывается по очередям подписчиков. Очередь подписчика ограничена:
+отставший подписчик помечается ``overflowed`` и должен переподключиться.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+
+class Subscription:
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+def deliver_all(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.deliver(message)
+
+
+class Broker:
+
+    def __init__(self):
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, maxsize=0):
+        """Подписка текущего цикла событий на ``channel``."""
+        subscription = Subscription(asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscriptions = self._channels.get(channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._channels[channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._channels.get(channel, ()))
+        by_loop = defaultdict(list)
+        for subscription in subscriptions:
+            by_loop[subscription.loop].append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(deliver_all, group, message)
+            except RuntimeError:
+                # Цикл событий уже закрыт вместе с его подписчиками.
+                pass
+        return len(subscriptions)
+
+
+broker = Broker()
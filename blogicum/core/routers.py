@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_state = ContextVar('replica_state', default=None)
+
+
+def replica_configured():
+    return settings.REPLICA_DATABASE in connections.databases
+
+
+def comments_configured():
+    return settings.COMMENTS_DATABASE in connections.databases
+
+
+def activate_replica_reads():
+    """Направляет чтения текущего запроса в реплику до первой записи."""
+    return _replica_state.set({'wrote': False})
+
+
+def deactivate_replica_reads(token):
+    _replica_state.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    token = activate_replica_reads()
+    try:
+        yield
+    finally:
+        deactivate_replica_reads(token)
+
+
+class ReplicaRouter:
+    """Отправляет чтения read-only представлений в ``REPLICA_DATABASE``.
+
+    После первой записи в рамках запроса все последующие чтения идут
+    в основную БД, чтобы запрос видел собственные изменения.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _replica_state.get()
+        if state is None or state['wrote'] or not replica_configured():
+            return None
+        return settings.REPLICA_DATABASE
+
+    def db_for_write(self, model, **hints):
+        state = _replica_state.get()
+        if state is not None:
+            state['wrote'] = True
+        if replica_configured():
+            # Иначе объект, загруженный из реплики, сохранялся бы в неё же.
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == settings.REPLICA_DATABASE:
+            return False
+        return None
+
+
+class CommentsRouter:
+    """Хранит модели из ``COMMENTS_DATABASE_MODELS`` в ``COMMENTS_DATABASE``.
+
+    Должен стоять в ``DATABASE_ROUTERS`` первым: остальные модели,
+    запрошенные через связь комментария, читаются из основной БД.
+    """
+
+    def is_comment_model(self, model):
+        return model._meta.label_lower in settings.COMMENTS_DATABASE_MODELS
+
+    def db_for_read(self, model, **hints):
+        if not comments_configured():
+            return None
+        if self.is_comment_model(model):
+            return settings.COMMENTS_DATABASE
+        instance = hints.get('instance')
+        if (instance is not None
+                and instance._state.db == settings.COMMENTS_DATABASE):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        if comments_configured() and self.is_comment_model(model):
+            return settings.COMMENTS_DATABASE
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if comments_configured() and (
+            self.is_comment_model(type(obj1))
+            or self.is_comment_model(type(obj2))
+        ):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not comments_configured():
+            return None
+        is_comment_model = (
+            f'{app_label}.{model_name}' in settings.COMMENTS_DATABASE_MODELS
+        )
+        if db == settings.COMMENTS_DATABASE:
+            return is_comment_model
+        if is_comment_model:
+            return False
+        return None
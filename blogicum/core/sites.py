@@ -0,0 +1,10 @@
+"""Абсолютные адреса сайта для ответов, которые кэшируются для всех.
+
+Адрес строится от ``SITE_URL``, а не от заголовка ``Host`` и схемы
+запроса: иначе кэш сохранил бы ссылки того, кто пришёл первым.
+"""
+from django.conf import settings
+
+
+def site_url(path):
+    return settings.SITE_URL.rstrip('/') + path
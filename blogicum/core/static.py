@@ -0,0 +1,56 @@
+"""Отдача собранной статики из ``STATIC_ROOT`` с долгим кэшированием.
+
+Файлы с хэшем в имени отдаются с ``Cache-Control: immutable`` на
+``STATIC_MAX_AGE``, остальные — с обязательной проверкой актуальности.
+Если клиент принимает gzip и рядом лежит ``.gz``-копия, отдаётся она.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+
+
+def accepts_gzip(request):
+    return 'gzip' in request.headers.get('Accept-Encoding', '')
+
+
+def serve(request, path):
+    if not settings.SERVE_STATIC or not settings.STATIC_ROOT:
+        raise Http404('Статика не раздаётся приложением')
+    full_path = safe_join(settings.STATIC_ROOT, path)
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден')
+    stat = os.stat(full_path)
+    if not was_modified_since(
+        request.headers.get('If-Modified-Since'), stat.st_mtime, stat.st_size
+    ):
+        response = HttpResponseNotModified()
+    else:
+        content_type, _ = mimetypes.guess_type(full_path)
+        serve_path = full_path
+        if accepts_gzip(request) and os.path.isfile(f'{full_path}.gz'):
+            serve_path = f'{full_path}.gz'
+        response = FileResponse(
+            open(serve_path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if serve_path != full_path:
+            response['Content-Encoding'] = 'gzip'
+        response['Last-Modified'] = http_date(stat.st_mtime)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if HASHED_NAME.search(path):
+        patch_cache_control(
+            response, public=True, max_age=settings.STATIC_MAX_AGE,
+            immutable=True,
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
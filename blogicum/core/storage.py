@@ -0,0 +1,100 @@
+import gzip
+import hashlib
+import os
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хэшированные имена статики плюс gzip-копии рядом с файлами.
+
+    Копии ``<name>.gz`` создаются при ``collectstatic`` только для
+    сжимаемых форматов и только если они меньше исходника;
+    отдаёт их ``core.static.serve``.
+    """
+
+    compress_extensions = (
+        '.css', '.js', '.svg', '.ico', '.txt', '.html', '.json', '.xml',
+        '.map',
+    )
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = {*paths, *self.hashed_files.values()}
+        for name in sorted(names):
+            if name.endswith(self.compress_extensions) and self.compress(name):
+                yield name, f'{name}.gz', True
+
+    def compress(self, name):
+        path = self.path(name)
+        if not os.path.isfile(path):
+            return False
+        with open(path, 'rb') as source:
+            content = source.read()
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) >= len(content):
+            return False
+        with open(f'{path}.gz', 'wb') as target:
+            target.write(compressed)
+        return True
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файлы под именем из SHA-256 содержимого в подкаталогах.
+
+    ``posts_images/photo.jpg`` сохраняется как
+    ``posts_images/ab/cd/abcd….jpg``: каталоги остаются небольшими, а
+    повторная загрузка того же файла не создаёт копию и не запускает
+    подбор свободного имени.
+    """
+
+    shard_depth = 2
+    shard_width = 2
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        shards = [
+            hexdigest[level * self.shard_width:(level + 1) * self.shard_width]
+            for level in range(self.shard_depth)
+        ]
+        return posixpath.join(directory, *shards, hexdigest + extension)
+
+    def is_content_name(self, name):
+        parts = name.split('/')
+        if len(parts) < self.shard_depth + 1:
+            return False
+        stem = os.path.splitext(parts[-1])[0]
+        shards = parts[-self.shard_depth - 1:-1]
+        return (
+            len(stem) == 64
+            and ''.join(shards) == stem[:self.shard_depth * self.shard_width]
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            # Повторная загрузка осиротевшего файла: свежий mtime не даёт
+            # collect_media_garbage удалить его до сохранения поста.
+            try:
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                pass
+        return super().save(name, content, max_length=max_length)
@@ -0,0 +1,14 @@
+from django import template
+
+from core.fragments import placeholder, render_fragment
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def fragment(context, name, *args):
+    """Персональный фрагмент: в оболочке страницы — метка,
+    иначе — фрагмент для текущего пользователя."""
+    if context.get('page_shell'):
+        return placeholder(name, *args)
+    return render_fragment(context['request'], name, *args)
@@ -0,0 +1,28 @@
+"""Предварительная компиляция шаблонов при старте процесса.
+
+С ``TEMPLATE_CACHE`` шаблоны загружает ``cached.Loader``: каждый файл
+читается и компилируется один раз за жизнь процесса. ``warm_templates``
+проходит по всем шаблонам проекта при старте воркера
+(``blogicum.wsgi``, ``blogicum.asgi``), и первый запрос не тратит время
+на разбор. ``{% include %}`` с постоянным именем внутри цикла получает
+уже скомпилированный шаблон из кэша загрузчика и разрешается один раз за
+рендер (``render_context`` тега).
+"""
+from pathlib import Path
+
+from django.template import engines
+
+
+def project_template_names(directories):
+    for directory in map(Path, directories):
+        for path in sorted(directory.rglob('*.html')):
+            yield path.relative_to(directory).as_posix()
+
+
+def warm_templates(using='django'):
+    """Компилирует все шаблоны из ``DIRS`` движка; возвращает их число."""
+    engine = engines[using].engine
+    names = list(project_template_names(engine.dirs))
+    for name in names:
+        engine.get_template(name)
+    return len(names)
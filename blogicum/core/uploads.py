@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class BoundedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет каждую загрузку сразу во временный файл, а не в память.
+
+    Данные сверх ``FILE_UPLOAD_MAX_BYTES`` дочитываются из запроса, но
+    не сохраняются: у файла остаётся полный размер, и форма отклоняет
+    его с понятной ошибкой вместо обрыва соединения.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= settings.FILE_UPLOAD_MAX_BYTES:
+            self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = self.received
+        return self.file
@@ -0,0 +1,69 @@
+import orjson
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.cache import add_never_cache_headers, patch_vary_headers
+
+from .fragments import is_registered, render_fragment, split_args
+
+
+class TemplateEngineMixin:
+    """Шаблоны из ``JINJA2_TEMPLATES`` рендерит движок Jinja2
+    (``core.jinja``), остальные — шаблонизатор Django."""
+
+    @property
+    def template_engine(self):
+        if self.template_name in settings.JINJA2_TEMPLATES:
+            return 'jinja2'
+        return None
+
+
+class FragmentResponseMixin:
+    """Ответ на запись фрагментом вместо редиректа.
+
+    Скрипт страницы присылает заголовок ``FRAGMENT_HEADER`` со значением
+    ``html`` или ``json`` и получает только изменённый фрагмент, чтобы
+    обновить страницу на месте. Запросы без заголовка получают прежний
+    ответ представления.
+    """
+
+    fragment_formats = ('html', 'json')
+
+    @property
+    def fragment_format(self):
+        value = self.request.headers.get(settings.FRAGMENT_HEADER, '')
+        value = value.strip().lower()
+        return value if value in self.fragment_formats else None
+
+    def fragment_response(self, html='', status=200, **data):
+        if self.fragment_format == 'json':
+            return HttpResponse(
+                orjson.dumps({**data, 'html': html}), status=status,
+                content_type='application/json',
+            )
+        return HttpResponse(html, status=status if html else 204)
+
+    def fragment_errors(self, form):
+        if self.fragment_format == 'json':
+            return HttpResponse(
+                orjson.dumps({'errors': form.errors.get_json_data()}),
+                status=400, content_type='application/json',
+            )
+        return HttpResponse(form.errors.as_ul(), status=400)
+
+    def handle_no_permission(self):
+        if self.fragment_format:
+            return HttpResponseForbidden()
+        return super().handle_no_permission()
+
+
+def fragment(request, name):
+    if not is_registered(name):
+        raise Http404('Фрагмент не найден')
+    args = split_args(request.GET.get('args', ''))
+    try:
+        response = HttpResponse(render_fragment(request, name, *args))
+    except (TypeError, ValueError):
+        raise Http404('Фрагмент не найден')
+    add_never_cache_headers(response)
+    patch_vary_headers(response, ('Cookie',))
+    return response
@@ -0,0 +1,127 @@
+"""Сериализация записей в SQLite через выделенный поток-писатель.
+
+SQLite допускает только одного писателя на файл БД, поэтому при
+всплесках конкурентных записей запросы падают с
+``OperationalError: database is locked``. При ``SERIALIZED_WRITES``
+транзакции записи выполняются по очереди в одном потоке на каждый файл
+БД, а чтения остаются конкурентными в потоках запросов. В поток-писатель
+передаётся только сама запись (``save_model``, ``SerializedSaveMixin``):
+чтения, работа с файлами и рендеринг ответа остаются в потоке запроса.
+"""
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import (DEFAULT_DB_ALIAS, OperationalError, connections,
+                       models, router, transaction)
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def is_lock_error(error):
+    return 'locked' in str(error)
+
+
+def execute_with_retry(func, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Выполняет ``func`` в транзакции, повторяя её с экспоненциальной
+    задержкой, пока БД заблокирована."""
+    attempts = settings.WRITE_RETRY_ATTEMPTS
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic(using=using):
+                return func(*args, **kwargs)
+        except OperationalError as error:
+            if not is_lock_error(error) or attempt == attempts - 1:
+                raise
+            delay = settings.WRITE_RETRY_BACKOFF * 2 ** attempt
+            time.sleep(delay * random.uniform(0.5, 1))
+
+
+class WriterThread(threading.Thread):
+
+    def __init__(self, name):
+        super().__init__(name=f'db-writer:{name}', daemon=True)
+        self.tasks = queue.Queue()
+
+    def submit(self, func, args, kwargs, using):
+        future = Future()
+        self.tasks.put((func, args, kwargs, using, future))
+        return future
+
+    def run(self):
+        while True:
+            func, args, kwargs, using, future = self.tasks.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(
+                    execute_with_retry(func, *args, using=using, **kwargs)
+                )
+            except Exception as error:
+                future.set_exception(error)
+            finally:
+                connections[using].close_if_unusable_or_obsolete()
+
+
+def get_writer(using=DEFAULT_DB_ALIAS):
+    """Возвращает поток-писатель для файла БД алиаса ``using``."""
+    name = str(connections.databases[using]['NAME'])
+    with _writers_lock:
+        writer = _writers.get(name)
+        if writer is None or not writer.is_alive():
+            writer = _writers[name] = WriterThread(name)
+            writer.start()
+    return writer
+
+
+def run_write(func, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Выполняет запись ``func(*args, **kwargs)`` в транзакции.
+
+    При включённом ``SERIALIZED_WRITES`` вызов передаётся потоку-писателю,
+    а текущий поток ждёт результат. Внутри уже открытой транзакции
+    запись выполняется на месте: другой поток не увидит её данных.
+    """
+    if (not settings.SERIALIZED_WRITES
+            or connections[using].in_atomic_block):
+        return execute_with_retry(func, *args, using=using, **kwargs)
+    future = get_writer(using).submit(func, args, kwargs, using)
+    return future.result(timeout=settings.WRITE_QUEUE_TIMEOUT)
+
+
+def store_files(instance):
+    """Кладёт новые файлы полей ``instance`` в хранилище — то же делает
+    ``FileField.pre_save``, но здесь это происходит в потоке запроса."""
+    for field in instance._meta.concrete_fields:
+        if isinstance(field, models.FileField):
+            file = getattr(instance, field.attname)
+            if file and not file._committed:
+                file.save(file.name, file.file, save=False)
+
+
+def save_model(instance, using=None):
+    """Сохраняет ``instance`` через ``run_write``.
+
+    Файлы сохраняются заранее, поэтому поток-писатель занят только
+    записью в БД. Без ``using`` БД выбирает роутер.
+    """
+    store_files(instance)
+    if using is None:
+        using = router.db_for_write(type(instance), instance=instance)
+    run_write(instance.save, using=using)
+    return instance
+
+
+class SerializedSaveMixin:
+    """Миксин ``ModelForm``: ``save()`` пишет объект через
+    ``save_model``, а не целиком в потоке запроса."""
+
+    def save(self, commit=True):
+        instance = super().save(commit=False)
+        if commit:
+            save_model(instance)
+            self._save_m2m()
+        return instance
@@ -30,7 +30,11 @@ def server_error(request, reason=''):
 
 class AboutView(TemplateView):
     template_name = 'pages/about.html'
+    replica_reads = True
+    cache_anonymous = True
 
 
 class RulesView(TemplateView):
     template_name = 'pages/rules.html'
+    replica_reads = True
+    cache_anonymous = True
@@ -0,0 +1,45 @@
+(function () {
+  var comments = document.getElementById('comments');
+  if (!comments) {
+    return;
+  }
+
+  function addComment(comment) {
+    if (!document.getElementsByName('comment_' + comment.id).length) {
+      comments.insertAdjacentHTML('beforeend', comment.html);
+    }
+  }
+
+  if (window.EventSource) {
+    var source = new EventSource(comments.dataset.liveUrl);
+    source.addEventListener('comment', function (event) {
+      addComment(JSON.parse(event.data));
+    });
+  }
+
+  if (window.fetch) {
+    document.addEventListener('submit', function (event) {
+      var form = event.target;
+      if (!form.hasAttribute('data-comment-form')) {
+        return;
+      }
+      event.preventDefault();
+      fetch(form.action, {
+        method: 'POST',
+        body: new FormData(form),
+        headers: {'X-Fragment': 'json'},
+        credentials: 'same-origin'
+      }).then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.json();
+      }).then(function (comment) {
+        addComment(comment);
+        form.reset();
+      }).catch(function () {
+        form.submit();
+      });
+    });
+  }
+})();
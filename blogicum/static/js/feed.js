@@ -0,0 +1,36 @@
+(function () {
+  var feed = document.getElementById('feed');
+  var sentinel = document.getElementById('feed-end');
+  if (!feed || !feed.dataset.nextUrl || !window.fetch
+      || !window.IntersectionObserver) {
+    return;
+  }
+  var loading = false;
+  var observer = new IntersectionObserver(function (entries) {
+    if (loading || !entries[0].isIntersecting) {
+      return;
+    }
+    loading = true;
+    fetch(feed.dataset.nextUrl, {credentials: 'same-origin'})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.json();
+      })
+      .then(function (batch) {
+        feed.insertAdjacentHTML('beforeend', batch.html);
+        if (batch.next) {
+          feed.dataset.nextUrl = batch.next;
+        } else {
+          observer.disconnect();
+        }
+        loading = false;
+      })
+      .catch(function () {
+        // Следующая попытка — когда конец ленты снова окажется в окне.
+        loading = false;
+      });
+  });
+  observer.observe(sentinel);
+})();
@@ -32,6 +32,17 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory):
+    """Общий файловый кэш — свой каталог на каждый тест."""
+    from django.conf import settings
+
+    location = str(tmp_path_factory.mktemp('cache'))
+    cache = {**settings.CACHES['default'], 'LOCATION': location}
+    with override_settings(CACHES={'default': cache}):
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
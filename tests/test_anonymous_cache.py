@@ -0,0 +1,43 @@
+import pytest
+from django.utils.cache import get_max_age
+
+pytestmark = [pytest.mark.django_db]
+
+
+def vary_headers(response):
+    return {
+        header.strip().lower()
+        for header in response.get('Vary', '').split(',')
+        if header.strip()
+    }
+
+
+@pytest.mark.parametrize('url', ['/', '/pages/about/'])
+def test_anonymous_pages_are_public(client, url):
+    response = client.get(url)
+    assert 'public' in response['Cache-Control'], (
+        'Убедитесь, что страницы для анонимных пользователей помечаются '
+        '`Cache-Control: public`.'
+    )
+    assert get_max_age(response) > 0
+    assert 'cookie' not in vary_headers(response), (
+        'Убедитесь, что страницы для анонимных пользователей без cookie '
+        'не содержат `Vary: Cookie`.'
+    )
+
+
+def test_authenticated_pages_are_private(user_client):
+    response = user_client.get('/')
+    assert 'private' in response['Cache-Control'], (
+        'Убедитесь, что страницы для авторизованных пользователей '
+        'помечаются `Cache-Control: private`.'
+    )
+    assert 'public' not in response['Cache-Control']
+    assert 'cookie' in vary_headers(response)
+
+
+def test_pages_with_csrf_token_are_not_public(client):
+    response = client.get('/auth/login/')
+    assert 'public' not in response.get('Cache-Control', ''), (
+        'Убедитесь, что страницы с CSRF-токеном не кэшируются общим кэшем.'
+    )
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category):
+    # Одинаковая дата у всех постов: курсор различает их по id.
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(25).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image='', pub_date=pub_date,
+    )
+
+
+@pytest.fixture
+def hidden_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False, image='', pub_date=timezone.now(),
+    )
+
+
+def test_feed_is_paginated_by_cursor(client, api_posts):
+    url, ids = reverse('blog:api_posts'), []
+    while url:
+        with CaptureQueriesContext(connection) as queries:
+            data = client.get(url).json()
+        assert len(queries) == 1, (
+            'Убедитесь, что страница API строится одним запросом.'
+        )
+        ids += [post['id'] for post in data['results']]
+        url = data['next']
+    assert ids == sorted((post.id for post in api_posts), reverse=True), (
+        'Убедитесь, что курсор проходит ленту без пропусков и повторов.'
+    )
+
+
+def test_sparse_fieldsets(client, api_posts):
+    data = client.get(
+        reverse('blog:api_posts'), {'fields': 'id,title,author'}
+    ).json()
+    assert set(data['results'][0]) == {'id', 'title', 'author'}, (
+        'Убедитесь, что параметр fields ограничивает поля ответа.'
+    )
+    assert data['results'][0]['author'] == api_posts[0].author.username
+    response = client.get(reverse('blog:api_posts'), {'fields': 'password'})
+    assert response.status_code == 400
+    response = client.get(reverse('blog:api_posts'), {'cursor': 'broken'})
+    assert response.status_code == 400
+
+
+def test_visibility_rules(client, user_client, api_posts, hidden_post, user):
+    detail = reverse('blog:api_post', args=[hidden_post.id])
+    assert client.get(detail).status_code == 404, (
+        'Убедитесь, что API не отдаёт снятый с публикации пост чужим '
+        'пользователям.'
+    )
+    assert user_client.get(detail).json()['text'] == hidden_post.text
+    profile = reverse('blog:api_profile_posts', args=[user.username])
+    ids = {post['id'] for post in client.get(profile).json()['results']}
+    assert hidden_post.id not in ids
+    ids = {post['id'] for post in user_client.get(profile).json()['results']}
+    assert hidden_post.id in ids, (
+        'Убедитесь, что автор видит в своём профиле все свои посты.'
+    )
+
+
+def test_comments(client, mixer, api_posts, another_user):
+    post = api_posts[0]
+    comments = mixer.cycle(3).blend(
+        'blog.Comment', post=post, author=another_user
+    )
+    url = reverse('blog:api_comments', args=[post.id])
+    data = client.get(url).json()
+    assert [comment['id'] for comment in data['results']] == [
+        comment.id for comment in comments
+    ]
+    assert data['results'][0]['author'] == another_user.username
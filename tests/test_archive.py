@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def archive_posts(mixer, user, published_category):
+    def blend(count, month):
+        return mixer.cycle(count).blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True, image='',
+            pub_date=datetime(2020, month, 15, tzinfo=timezone.utc),
+        )
+    return {1: blend(12, 1), 2: blend(12, 2)}
+
+
+def test_month_archive_shows_only_month_posts(
+    client, archive_posts, published_category, user
+):
+    urls = (
+        reverse('blog:index_archive', args=[2020, 1]),
+        reverse('blog:category_archive', args=[published_category.slug,
+                                               2020, 1]),
+        reverse('blog:profile_archive', args=[user.username, 2020, 1]),
+    )
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == 200
+        paginator = response.context['paginator']
+        assert paginator.count == 12, (
+            'Убедитесь, что архив за месяц показывает только посты '
+            'этого месяца.'
+        )
+        assert all(post.pub_date.month == 1
+                   for post in response.context['page_obj'])
+        months = [
+            (month['date'].month, month['count'])
+            for month in response.context['archive_months']
+        ]
+        assert months == [(2, 12), (1, 12)], (
+            'Убедитесь, что навигация по архиву строится по гистограмме '
+            'постов по месяцам.'
+        )
+
+
+def test_year_archive_and_invalid_month(client, archive_posts):
+    response = client.get(reverse('blog:index_archive', args=[2020]))
+    assert response.context['paginator'].count == 24
+    response = client.get(reverse('blog:index_archive', args=[2020, 13]))
+    assert response.status_code == 404
+
+
+@override_settings(FEED_MAX_PAGE=1)
+def test_deep_pages_redirect_to_archive(client, archive_posts):
+    response = client.get(reverse('blog:index'), {'page': 3})
+    assert response.status_code == 302
+    assert response['Location'] == reverse(
+        'blog:index_archive', args=[2020, 1]
+    ), (
+        'Убедитесь, что глубокие страницы ленты перенаправляются в архив '
+        'месяца, в который попадает такая страница.'
+    )
+    assert client.get(reverse('blog:index'), {'page': 50}).status_code == 404
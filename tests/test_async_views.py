@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from blog.views import PostDetailView
+from core.aio import async_view, run_in_pool
+from core.middleware import AnonymousCacheMiddleware, ReplicaRoutingMiddleware
+from django.test import AsyncClient
+from django.urls import include, path, reverse
+
+# Запросы из пула потоков идут через свои соединения и не видят
+# незафиксированную транзакцию обычного теста.
+pytestmark = [
+    pytest.mark.django_db(transaction=True),
+    pytest.mark.urls(__name__),
+]
+
+urlpatterns = [
+    path(
+        'async/posts/<int:id>/',
+        async_view(PostDetailView.as_view()),
+        name='async_post_detail'
+    ),
+    path('', include('blogicum.urls')),
+]
+
+
+@pytest.fixture
+def visible_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image='',
+    )
+
+
+def test_async_variant_matches_sync_view(client, visible_post):
+    sync_response = client.get(
+        reverse('blog:post_detail', args=[visible_post.id])
+    )
+    async_response = async_to_sync(AsyncClient().get)(
+        reverse('async_post_detail', args=[visible_post.id])
+    )
+    assert async_response.status_code == 200
+    assert visible_post.title in async_response.content.decode()
+    assert async_response.content == sync_response.content, (
+        'Убедитесь, что асинхронный вариант отдаёт ту же страницу.'
+    )
+    assert 'public' in async_response['Cache-Control'], (
+        'Убедитесь, что middleware проекта работает и в асинхронном стеке.'
+    )
+
+
+def test_orm_runs_in_bounded_pool():
+    name = async_to_sync(run_in_pool)(lambda: threading.current_thread().name)
+    assert name.startswith('async-view'), (
+        'Убедитесь, что асинхронные представления обращаются к БД в '
+        'отдельном пуле потоков.'
+    )
+
+
+@pytest.mark.parametrize(
+    'middleware', (AnonymousCacheMiddleware, ReplicaRoutingMiddleware)
+)
+def test_middleware_is_async_capable(middleware):
+    async def get_response(request):
+        return None
+
+    assert asyncio.iscoroutinefunction(middleware(get_response))
+    assert asyncio.iscoroutinefunction(middleware(get_response).process_view)
+    assert not asyncio.iscoroutinefunction(middleware(lambda request: None))
@@ -0,0 +1,64 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post_with_comment(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, text='Первая строка\n<b>вторая</b>', image='',
+    )
+    mixer.blend(
+        'blog.Comment', post=post, author=user, text='Комментарий\nещё'
+    )
+    return post
+
+
+def test_post_detail_emits_cached_html(client, post_with_comment):
+    from blog.rendering import body_html_key
+
+    url = reverse('blog:post_detail', kwargs={'id': post_with_comment.id})
+    content = client.get(url).content.decode()
+    assert 'Первая строка<br>&lt;b&gt;вторая&lt;/b&gt;' in content, (
+        'Убедитесь, что текст поста выводится с переносами и экранированием.'
+    )
+    assert 'Комментарий<br>ещё' in content
+    comment = post_with_comment.comments.get()
+    assert cache.get(body_html_key(post_with_comment)) is not None, (
+        'Убедитесь, что HTML текста поста сохраняется в кэше.'
+    )
+    assert cache.get(body_html_key(comment)) is not None, (
+        'Убедитесь, что HTML текстов комментариев сохраняется в кэше.'
+    )
+
+
+def test_edit_invalidates_cached_html(client, post_with_comment):
+    from blog.rendering import body_html_key
+
+    url = reverse('blog:post_detail', kwargs={'id': post_with_comment.id})
+    client.get(url)
+    post_with_comment.text = 'Новый текст'
+    post_with_comment.save()
+    comment = post_with_comment.comments.get()
+    comment.text = 'Новый комментарий'
+    comment.save()
+    assert cache.get(body_html_key(post_with_comment)) is None
+    content = client.get(url).content.decode()
+    assert 'Новый текст' in content and 'Новый комментарий' in content, (
+        'Убедитесь, что после правки страница показывает новый текст.'
+    )
+
+
+def test_queryset_update_changes_cache_key(post_with_comment):
+    from blog.models import Post
+
+    assert 'Первая строка' in post_with_comment.body_html
+    Post.objects.filter(pk=post_with_comment.pk).update(text='Обновлено')
+    post = Post.objects.get(pk=post_with_comment.pk)
+    assert post.body_html == 'Обновлено', (
+        'Убедитесь, что ключ кэша HTML зависит от текста и правка через '
+        '`QuerySet.update` не оставляет старый HTML.'
+    )
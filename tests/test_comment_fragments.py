@@ -0,0 +1,82 @@
+import pytest
+from blog.models import Comment
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+JSON = {'HTTP_X_FRAGMENT': 'json'}
+HTML = {'HTTP_X_FRAGMENT': 'html'}
+
+
+@pytest.fixture
+def fragment_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image='',
+    )
+
+
+@pytest.fixture
+def own_comment(mixer, fragment_post, user):
+    return mixer.blend(
+        'blog.Comment', post=fragment_post, author=user, text='Старый текст'
+    )
+
+
+def test_create_returns_comment_fragment(user_client, fragment_post):
+    url = reverse('blog:add_comment', args=[fragment_post.id])
+    response = user_client.post(url, {'text': 'Новый комментарий'}, **JSON)
+    assert response.status_code == 201, (
+        'Убедитесь, что с заголовком X-Fragment комментарий создаётся без '
+        'редиректа.'
+    )
+    data = response.json()
+    comment = Comment.objects.get(id=data['id'])
+    assert comment.text == 'Новый комментарий'
+    assert f'name="comment_{comment.id}"' in data['html']
+    assert reverse('blog:edit_comment', args=[fragment_post.id, comment.id]) in (
+        data['html']
+    ), 'Убедитесь, что фрагмент содержит ссылки автора комментария.'
+    response = user_client.post(url, {'text': 'Без заголовка'})
+    assert response.status_code == 302, (
+        'Убедитесь, что без заголовка X-Fragment сохраняется редирект.'
+    )
+
+
+def test_edit_and_delete_return_fragments(user_client, own_comment):
+    args = [own_comment.post_id, own_comment.id]
+    response = user_client.post(
+        reverse('blog:edit_comment', args=args), {'text': 'Новый текст'},
+        **HTML
+    )
+    assert response.status_code == 200
+    assert 'Новый текст' in response.content.decode()
+    assert '<html' not in response.content.decode(), (
+        'Убедитесь, что в режиме фрагмента возвращается только комментарий.'
+    )
+    response = user_client.post(
+        reverse('blog:delete_comment', args=args), **JSON
+    )
+    assert response.json() == {
+        'id': own_comment.id, 'deleted': True, 'html': '',
+    }
+    assert not Comment.objects.filter(id=own_comment.id).exists()
+
+
+def test_fragment_errors(client, user_client, another_user_client,
+                         fragment_post, own_comment):
+    url = reverse('blog:add_comment', args=[fragment_post.id])
+    response = user_client.post(url, {'text': ''}, **JSON)
+    assert response.status_code == 400
+    assert 'text' in response.json()['errors']
+    assert client.post(url, {'text': 'Аноним'}, **JSON).status_code == 403, (
+        'Убедитесь, что анонимный запрос фрагмента получает 403, а не '
+        'страницу входа.'
+    )
+    response = another_user_client.post(
+        reverse('blog:delete_comment',
+                args=[own_comment.post_id, own_comment.id]),
+        **JSON
+    )
+    assert response.status_code == 403
+    assert Comment.objects.filter(id=own_comment.id).exists()
@@ -0,0 +1,119 @@
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def comments_database(tmp_path):
+    alias = settings.COMMENTS_DATABASE
+    connections.databases[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': tmp_path / 'comments.sqlite3',
+    }
+    connections.ensure_defaults(alias)
+    connections.prepare_test_settings(alias)
+    call_command('migrate', database=alias, verbosity=0)
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+@pytest.fixture
+def split_comment(mixer, comments_database, published_category):
+    from blog.models import Comment
+
+    post = mixer.blend('blog.Post', category=published_category)
+    comment = Comment.objects.create(
+        text='Комментарий из отдельной БД', post=post, author=post.author
+    )
+    return comment
+
+
+def test_comments_are_stored_in_separate_database(
+    split_comment, comments_database, user_client
+):
+    from blog.models import Comment
+
+    assert split_comment._state.db == comments_database
+    assert not Comment.objects.using('default').exists(), (
+        'Убедитесь, что при настроенной COMMENTS_DATABASE комментарии не '
+        'записываются в основную БД.'
+    )
+    post = split_comment.post
+    assert post.comment_count == 1
+    response = user_client.get(f'/posts/{post.id}/')
+    assert split_comment.text in response.content.decode('utf-8'), (
+        'Убедитесь, что страница поста показывает комментарии '
+        'из отдельной БД.'
+    )
+
+
+def test_post_delete_cleans_up_comments(split_comment):
+    from blog.models import Comment
+
+    split_comment.post.delete()
+    assert not Comment.objects.exists(), (
+        'Убедитесь, что при удалении поста удаляются его комментарии '
+        'в отдельной БД.'
+    )
+
+
+def test_check_comments_deletes_orphans(split_comment):
+    from blog.models import Comment, Post
+
+    Post.objects.filter(pk=split_comment.post_id).delete()
+    Comment.objects.create(
+        text='Сирота', post_id=split_comment.post_id,
+        author=split_comment.author,
+    )
+    out = StringIO()
+    call_command('check_comments', delete=True, stdout=out)
+    assert 'несуществующих 1' in out.getvalue()
+    assert not Comment.objects.exists(), (
+        'Убедитесь, что check_comments --delete удаляет комментарии '
+        'к несуществующим постам.'
+    )
+
+
+def test_move_comments_keeps_existing_comments_visible(
+    request, mixer, published_category, user_client
+):
+    from blog.models import Comment
+
+    post = mixer.blend('blog.Post', category=published_category)
+    comments = [
+        Comment.objects.create(
+            text=f'Старый комментарий {number}', post=post, author=post.author
+        )
+        for number in range(3)
+    ]
+    alias = request.getfixturevalue('comments_database')
+    out = StringIO()
+    with override_settings(COMMENTS_BATCH_SIZE=2):
+        call_command('move_comments', stdout=out)
+        call_command('move_comments', delete=True, stdout=out)
+    assert 'Скопировано комментариев: 3, уже были: 0' in out.getvalue()
+    assert (
+        'Скопировано комментариев: 0, уже были: 3, '
+        'удалено из основной БД: 3'
+    ) in out.getvalue()
+    assert not Comment.objects.using('default').exists(), (
+        'Убедитесь, что move_comments --delete удаляет перенесённые '
+        'комментарии из основной БД.'
+    )
+    assert list(
+        Comment.objects.using(alias).values_list('pk', flat=True)
+    ) == [comment.pk for comment in comments]
+    content = user_client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    for comment in comments:
+        assert comment.text in content, (
+            'Убедитесь, что после move_comments существующие комментарии '
+            'видны на странице поста.'
+        )
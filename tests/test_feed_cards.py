@@ -0,0 +1,61 @@
+import re
+
+import pytest
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    return mixer.cycle(25).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image='',
+    )
+
+
+def card_ids(html):
+    return [int(pk) for pk in re.findall(r'/posts/(\d+)/" class="card-link"',
+                                         html)]
+
+
+def test_cards_continue_the_feed_page(
+    client, feed_posts, published_category, user
+):
+    pages = (
+        (reverse('blog:index'), 'blog:index_cards', []),
+        (reverse('blog:category_posts', args=[published_category.slug]),
+         'blog:category_cards', [published_category.slug]),
+        (reverse('blog:profile', args=[user.username]),
+         'blog:profile_cards', [user.username]),
+    )
+    expected = [
+        post.id for post in
+        sorted(feed_posts, key=lambda post: (post.pub_date, post.id),
+               reverse=True)
+    ]
+    for page_url, url_name, args in pages:
+        response = client.get(page_url)
+        ids = card_ids(response.context['cards_html'])
+        url = response.context['next_cards_url']
+        assert url.startswith(reverse(url_name, args=args))
+        while url:
+            response = client.get(url)
+            assert response['Content-Type'] == 'application/json'
+            batch = response.json()
+            ids += card_ids(batch['html'])
+            url = batch['next']
+        assert ids == expected, (
+            f'Убедитесь, что подгрузка карточек `{url_name}` продолжает '
+            'ленту без пропусков и повторов.'
+        )
+
+
+def test_cards_are_cacheable_for_anonymous(client, user_client, feed_posts):
+    url = client.get(reverse('blog:index')).context['next_cards_url']
+    assert 'public' in client.get(url)['Cache-Control'], (
+        'Убедитесь, что пачки карточек для анонимов кэшируются по курсору.'
+    )
+    assert 'private' in user_client.get(url)['Cache-Control']
+    response = client.get(reverse('blog:index_cards'), {'cursor': 'broken'})
+    assert response.status_code == 400
@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Публикация для ленты', image='',
+    )
+
+
+@pytest.fixture
+def feed_urls(feed_post):
+    slug, username = feed_post.category.slug, feed_post.author.username
+    return (
+        reverse('blog:feed'),
+        reverse('blog:feed_atom'),
+        reverse('blog:category_feed', args=[slug]),
+        reverse('blog:category_feed_atom', args=[slug]),
+        reverse('blog:profile_feed', args=[username]),
+        reverse('blog:profile_feed_atom', args=[username]),
+    )
+
+
+def test_feeds_are_built_with_one_query_and_cached(client, feed_urls):
+    for url in feed_urls:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert 'Публикация для ленты' in response.content.decode()
+        assert len(queries) == 1, (
+            f'Убедитесь, что лента `{url}` строится одним запросом.'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        assert not queries, (
+            f'Убедитесь, что лента `{url}` отдаётся из кэша.'
+        )
+
+
+def test_feed_supports_conditional_requests(client, feed_urls):
+    response = client.get(feed_urls[0])
+    assert client.get(
+        feed_urls[0], HTTP_IF_NONE_MATCH=response['ETag']
+    ).status_code == 304, 'Убедитесь, что лента поддерживает ETag.'
+    assert client.get(
+        feed_urls[0], HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == 304, (
+        'Убедитесь, что лента поддерживает If-Modified-Since.'
+    )
+
+
+def test_feed_is_regenerated_on_post_change(client, feed_urls, feed_post):
+    for url in feed_urls:
+        client.get(url)
+    feed_post.title = 'Новый заголовок'
+    feed_post.save()
+    for url in feed_urls:
+        assert 'Новый заголовок' in client.get(url).content.decode(), (
+            'Убедитесь, что ленты обновляются при изменении поста.'
+        )
+
+
+def test_unknown_category_feed_is_404(client, mixer):
+    category = mixer.blend('blog.Category', is_published=False)
+    url = reverse('blog:category_feed', args=[category.slug])
+    assert client.get(url).status_code == 404
+
+
+@override_settings(SITE_URL='https://blogicum.example')
+def test_cached_links_do_not_depend_on_host(client, feed_urls, feed_post):
+    for url in feed_urls:
+        client.get(url, HTTP_HOST='localhost')
+        content = client.get(url, HTTP_HOST='127.0.0.1').content.decode()
+        assert 'localhost' not in content and '127.0.0.1' not in content, (
+            'Убедитесь, что ссылки в кэшированной ленте строятся от '
+            'SITE_URL, а не от заголовка Host первого запроса.'
+        )
+        post_url = reverse('blog:post_detail', args=[feed_post.id])
+        assert f'https://blogicum.example{post_url}' in content
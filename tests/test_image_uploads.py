@@ -0,0 +1,88 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_upload(size=(300, 100), image_format='JPEG', name='photo.jpg'):
+    buffer = BytesIO()
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera'
+    Image.new('RGB', size, 'blue').save(buffer, image_format, exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+@pytest.fixture
+def post_data(mixer, published_category):
+    return {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2020-01-01 00:00',
+        'category': published_category.pk,
+        'location': mixer.blend('blog.Location').pk,
+    }
+
+
+def post_form(data, image):
+    from blog.forms import PostForm
+
+    return PostForm(data=data, files={'image': image})
+
+
+@override_settings(FILE_UPLOAD_MAX_BYTES=100)
+def test_upload_handler_stops_writing_over_limit():
+    from core.uploads import BoundedTemporaryFileUploadHandler
+
+    handler = BoundedTemporaryFileUploadHandler()
+    handler.new_file('image', 'photo.jpg', 'image/jpeg', None)
+    for start in range(0, 300, 60):
+        handler.receive_data_chunk(b'x' * 60, start)
+    upload = handler.file_complete(300)
+    with open(upload.temporary_file_path(), 'rb') as file:
+        assert len(file.read()) <= 100, (
+            'Убедитесь, что данные сверх `FILE_UPLOAD_MAX_BYTES` не '
+            'сохраняются на диск.'
+        )
+    assert upload.size == 300, (
+        'Убедитесь, что у загрузки сохраняется полный размер.'
+    )
+    upload.close()
+
+
+@override_settings(FILE_UPLOAD_MAX_BYTES=100)
+def test_upload_over_byte_limit_is_rejected(post_data):
+    form = post_form(post_data, make_upload())
+    assert not form.is_valid() and 'image' in form.errors, (
+        'Убедитесь, что форма поста отклоняет файлы больше '
+        '`FILE_UPLOAD_MAX_BYTES`.'
+    )
+
+
+@override_settings(IMAGE_UPLOAD_MAX_PIXELS=1000)
+def test_oversized_dimensions_are_rejected(post_data):
+    form = post_form(post_data, make_upload(size=(40, 40)))
+    assert not form.is_valid() and 'image' in form.errors, (
+        'Убедитесь, что изображения с числом пикселей больше '
+        '`IMAGE_UPLOAD_MAX_PIXELS` отклоняются.'
+    )
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_accepted_image_is_reencoded(post_data, workers):
+    with override_settings(IMAGE_WORKERS=workers, IMAGE_MAX_DIMENSION=60):
+        form = post_form(post_data, make_upload())
+        assert form.is_valid(), form.errors
+    image = form.cleaned_data['image']
+    with Image.open(image.temporary_file_path()) as result:
+        assert max(result.size) == 60, (
+            'Убедитесь, что длинная сторона изображения уменьшается до '
+            '`IMAGE_MAX_DIMENSION`.'
+        )
+        assert not result.getexif(), (
+            'Убедитесь, что при перекодировании удаляются данные EXIF.'
+        )
+    image.close()
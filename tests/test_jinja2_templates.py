@@ -0,0 +1,67 @@
+import re
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+
+pytest.importorskip('jinja2')
+
+pytestmark = [pytest.mark.django_db]
+
+JINJA2_TEMPLATES = {
+    'blog/index.html', 'blog/category.html', 'blog/profile.html',
+    'blog/post_detail.html',
+}
+
+
+def normalize(content):
+    content = re.sub(r'value="\w+"', '', content.decode())
+    return re.sub(r'\s+', ' ', content).strip()
+
+
+@pytest.fixture
+def post(mixer, user, published_category, published_location):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, is_published=True,
+        text='Текст\n<поста>', image='',
+    )
+    mixer.blend('blog.Comment', post=post, author=user, text='Ответ\nтут')
+    return post
+
+
+@pytest.mark.parametrize('client_fixture', ['client', 'user_client'])
+def test_jinja2_templates_match_django_templates(
+    request, post, client_fixture
+):
+    client = request.getfixturevalue(client_fixture)
+    urls = (
+        reverse('blog:index'),
+        reverse('blog:category_posts', args=[post.category.slug]),
+        reverse('blog:profile', args=[post.author.username]),
+        reverse('blog:post_detail', args=[post.id]),
+    )
+    expected = [normalize(client.get(url).content) for url in urls]
+    with override_settings(
+        TEMPLATES=[*settings.TEMPLATES, settings.JINJA2_ENGINE],
+        JINJA2_TEMPLATES=JINJA2_TEMPLATES,
+    ):
+        for url, html in zip(urls, expected):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert normalize(response.content) == html, (
+                f'Убедитесь, что шаблон Jinja2 для `{url}` выводит ту же '
+                'страницу, что и шаблон Django.'
+            )
+
+
+def test_linebreaksbr_escapes_text():
+    from core.jinja import environment
+
+    template = environment(autoescape=True).from_string(
+        '{{ text|linebreaksbr }}'
+    )
+    assert template.render(text='<script>\nx') == '&lt;script&gt;<br>x', (
+        'Убедитесь, что фильтр linebreaksbr в Jinja2 экранирует текст.'
+    )
@@ -0,0 +1,159 @@
+import asyncio
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from blog.live import LiveCommentsMiddleware, comment_channel
+from core.aio import run_in_pool
+from core.pubsub import broker
+from django.urls import reverse
+
+# Потоки открываются из пула core.aio со своими соединениями с БД.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+IDLE_SUBSCRIBERS = 5000
+
+
+async def not_found(scope, receive, send):
+    raise AssertionError('Запрос не должен уйти в приложение Django.')
+
+
+class Stream:
+    """Клиент SSE: складывает полученные куски тела."""
+
+    def __init__(self, application, url, headers=(), host=b'localhost'):
+        self.disconnected = asyncio.Event()
+        self.received = asyncio.Event()
+        self.status = None
+        self.body = b''
+        self.task = asyncio.ensure_future(application(
+            {'type': 'http', 'method': 'GET', 'path': url,
+             'query_string': b'', 'headers': [(b'host', host), *headers]},
+            self.receive, self.send,
+        ))
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        else:
+            self.body += message.get('body', b'')
+            if b'event: comment' in self.body:
+                self.received.set()
+
+    async def close(self):
+        self.disconnected.set()
+        await self.task
+
+
+@pytest.fixture
+def live_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image='',
+    )
+
+
+def test_live_stream_is_asgi_only(client, live_post):
+    response = client.get(reverse('blog:post_live', args=[live_post.id]))
+    assert response.status_code == 204, (
+        'Убедитесь, что без ASGI поток комментариев отвечает 204 и браузер '
+        'не переподключается.'
+    )
+
+
+def test_idle_subscribers_receive_one_comment(mixer, live_post, user):
+    application = LiveCommentsMiddleware(not_found)
+    url = reverse('blog:post_live', args=[live_post.id])
+    channel = comment_channel(live_post.id)
+
+    async def scenario():
+        streams = [Stream(application, url) for _ in range(IDLE_SUBSCRIBERS)]
+        while broker.subscriber_count(channel) < IDLE_SUBSCRIBERS:
+            await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        comment = await run_in_pool(
+            mixer.blend, 'blog.Comment', post=live_post, author=user,
+            text='Свежий комментарий',
+        )
+        await asyncio.wait_for(
+            asyncio.gather(*(stream.received.wait() for stream in streams)),
+            timeout=30,
+        )
+        elapsed = time.perf_counter() - start
+        await asyncio.gather(*(stream.close() for stream in streams))
+        return comment, streams, elapsed
+
+    comment, streams, elapsed = async_to_sync(scenario)()
+    assert all(stream.status == 200 for stream in streams)
+    assert all(
+        f'id: {comment.id}'.encode() in stream.body for stream in streams
+    ), 'Убедитесь, что новый комментарий получают все подписчики поста.'
+    assert 'Свежий комментарий' in streams[0].body.decode()
+    assert elapsed < 10, (
+        f'Рассылка {IDLE_SUBSCRIBERS} подписчикам заняла {elapsed:.1f} с.'
+    )
+    assert broker.subscriber_count(channel) == 0, (
+        'Убедитесь, что отключившиеся клиенты отписываются.'
+    )
+
+
+def test_reconnect_receives_missed_comments(mixer, live_post, user):
+    first, missed = mixer.cycle(2).blend(
+        'blog.Comment', post=live_post, author=user
+    )
+    application = LiveCommentsMiddleware(not_found)
+    url = reverse('blog:post_live', args=[live_post.id])
+
+    async def scenario():
+        stream = Stream(
+            application, url,
+            headers=[(b'last-event-id', str(first.id).encode())],
+        )
+        await asyncio.wait_for(stream.received.wait(), timeout=10)
+        await stream.close()
+        return stream.body
+
+    body = async_to_sync(scenario)()
+    assert f'id: {missed.id}'.encode() in body, (
+        'Убедитесь, что при переподключении клиент получает пропущенные '
+        'комментарии.'
+    )
+    assert f'id: {first.id}\n'.encode() not in body
+
+
+def test_unpublished_post_has_no_stream(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False, image='',
+    )
+    application = LiveCommentsMiddleware(not_found)
+
+    async def scenario():
+        stream = Stream(
+            application, reverse('blog:post_live', args=[post.id])
+        )
+        await stream.task
+        return stream.status
+
+    assert async_to_sync(scenario)() == 404
+
+
+def test_unknown_host_is_rejected(live_post):
+    application = LiveCommentsMiddleware(not_found)
+
+    async def scenario():
+        stream = Stream(
+            application, reverse('blog:post_live', args=[live_post.id]),
+            host=b'evil.example',
+        )
+        await stream.task
+        return stream.status
+
+    assert async_to_sync(scenario)() == 400, (
+        'Убедитесь, что поток комментариев проверяет заголовок Host по '
+        'ALLOWED_HOSTS.'
+    )
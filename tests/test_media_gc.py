@@ -0,0 +1,60 @@
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+OLD = time.time() - 7 * 24 * 60 * 60
+
+
+@pytest.fixture
+def media_tree(tmp_path, mixer, user, published_category):
+    root = tmp_path / 'media'
+    files = {
+        'referenced': root / 'posts_images' / 'aa' / 'referenced.gif',
+        'old_orphan': root / 'posts_images' / 'bb' / 'old_orphan.gif',
+        'new_orphan': root / 'posts_images' / 'cc' / 'new_orphan.gif',
+    }
+    for path in files.values():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x' * 100)
+    os.utime(files['referenced'], (OLD, OLD))
+    os.utime(files['old_orphan'], (OLD, OLD))
+    with override_settings(
+        MEDIA_ROOT=root, MEDIA_GC_STATE_FILE=tmp_path / 'gc_state'
+    ):
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            image='posts_images/aa/referenced.gif',
+        )
+        yield files
+
+
+def test_only_old_unreferenced_files_are_deleted(media_tree):
+    out = StringIO()
+    call_command('collect_media_garbage', stdout=out)
+    assert media_tree['referenced'].exists(), (
+        'Убедитесь, что сборщик мусора не удаляет файлы, на которые '
+        'ссылаются посты.'
+    )
+    assert not media_tree['old_orphan'].exists(), (
+        'Убедитесь, что сборщик мусора удаляет старые файлы без ссылок.'
+    )
+    assert media_tree['new_orphan'].exists(), (
+        'Убедитесь, что сборщик мусора не удаляет файлы моложе '
+        'MEDIA_GC_GRACE_PERIOD.'
+    )
+    assert 'освобождено байт: 100' in out.getvalue()
+
+
+def test_walk_resumes_from_cursor(media_tree):
+    call_command('collect_media_garbage', limit=1, stdout=StringIO())
+    assert media_tree['old_orphan'].exists()
+    call_command('collect_media_garbage', limit=1, stdout=StringIO())
+    assert not media_tree['old_orphan'].exists(), (
+        'Убедитесь, что обход медиафайлов продолжается с места остановки.'
+    )
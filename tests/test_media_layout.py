@@ -0,0 +1,89 @@
+import os
+import re
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+SHARDED_NAME = re.compile(
+    r'^posts_images/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.gif$'
+)
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=tmp_path):
+        yield tmp_path
+
+
+@pytest.fixture
+def image_content():
+    buffer = BytesIO()
+    Image.new('RGB', (4, 4), 'red').save(buffer, 'GIF')
+    return buffer.getvalue()
+
+
+def test_uploads_are_sharded_and_deduplicated(
+    media_root, image_content, mixer, user, published_category
+):
+    posts = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category, image=''
+    )
+    for post in posts:
+        post.image.save('photo.gif', ContentFile(image_content))
+    first, second = (post.image.name for post in posts)
+    assert SHARDED_NAME.match(first), (
+        'Убедитесь, что изображения постов раскладываются по '
+        'подкаталогам по хэшу содержимого.'
+    )
+    assert first == second, (
+        'Убедитесь, что одинаковые изображения хранятся одним файлом.'
+    )
+    stored = [path for path in media_root.rglob('*') if path.is_file()]
+    assert len(stored) == 1
+
+
+def test_deduplicated_upload_refreshes_mtime(
+    media_root, image_content, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category, image=''
+    )
+    post.image.save('photo.gif', ContentFile(image_content))
+    path = media_root / post.image.name
+    old = time.time() - 7 * 24 * 60 * 60
+    os.utime(path, (old, old))
+    post.image.save('again.gif', ContentFile(image_content))
+    assert path.stat().st_mtime > old + 60, (
+        'Убедитесь, что повторная загрузка существующего файла обновляет '
+        'его mtime и сборщик мусора не удалит его как старый.'
+    )
+
+
+def test_shard_media_moves_legacy_files(
+    media_root, image_content, mixer, user, published_category
+):
+    from blog.models import Post
+
+    (media_root / 'posts_images').mkdir()
+    (media_root / 'posts_images' / 'legacy.gif').write_bytes(image_content)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category, image=''
+    )
+    Post.objects.filter(pk=post.pk).update(image='posts_images/legacy.gif')
+
+    call_command('shard_media', delete_old=True, stdout=StringIO())
+
+    post.refresh_from_db()
+    assert SHARDED_NAME.match(post.image.name), (
+        'Убедитесь, что shard_media переносит существующие изображения '
+        'в новую раскладку и обновляет ссылки в постах.'
+    )
+    assert (media_root / post.image.name).read_bytes() == image_content
+    assert not (media_root / 'posts_images' / 'legacy.gif').exists()
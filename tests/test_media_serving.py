@@ -0,0 +1,73 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def media_file(tmp_path):
+    (tmp_path / 'posts_images').mkdir()
+    (tmp_path / 'posts_images' / 'photo.jpg').write_bytes(CONTENT)
+    with override_settings(MEDIA_ROOT=tmp_path):
+        yield '/media/posts_images/photo.jpg'
+
+
+def read(response):
+    return b''.join(response.streaming_content)
+
+
+def test_full_download_has_validators(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert read(response) == CONTENT
+    assert response['Accept-Ranges'] == 'bytes'
+    not_modified = client.get(media_file, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert not_modified.status_code == 304, (
+        'Убедитесь, что медиафайлы отдаются с ETag и поддерживают '
+        'условные запросы.'
+    )
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-99', CONTENT[:100]),
+    ('bytes=10000-', CONTENT[10000:]),
+    ('bytes=-24', CONTENT[-24:]),
+])
+def test_range_requests(client, media_file, header, expected):
+    response = client.get(media_file, HTTP_RANGE=header)
+    assert response.status_code == 206, (
+        'Убедитесь, что медиафайлы поддерживают запросы диапазонов.'
+    )
+    assert read(response) == expected
+    assert int(response['Content-Length']) == len(expected)
+    assert response['Content-Range'].endswith(f'/{len(CONTENT)}')
+
+
+def test_unsatisfiable_range(client, media_file):
+    response = client.get(media_file, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+    assert response.status_code == 416
+    assert response['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+
+def test_stale_if_range_returns_full_file(client, media_file):
+    response = client.get(
+        media_file, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == 200
+    assert read(response) == CONTENT
+
+
+@override_settings(MEDIA_SERVING='x-accel-redirect')
+def test_x_accel_redirect_offloads_transfer(client, media_file):
+    response = client.get(media_file)
+    assert response['X-Accel-Redirect'] == (
+        '/protected-media/posts_images/photo.jpg'
+    ), 'Убедитесь, что в режиме x-accel-redirect отдачу выполняет nginx.'
+    assert response.content == b''
+
+
+def test_path_traversal_is_rejected(client, media_file):
+    response = client.get('/media/../settings.py')
+    assert response.status_code in (400, 404)
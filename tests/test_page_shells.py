@@ -0,0 +1,87 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def shell_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=None,
+    )
+
+
+@override_settings(PAGE_SHELLS=True)
+def test_shell_is_shared_and_fragments_are_personal(
+    shell_post, user, user_client, another_user_client
+):
+    url = f'/posts/{shell_post.id}/'
+    edit_url = f'/posts/{shell_post.id}/edit/'
+    author_content = user_client.get(url).content.decode('utf-8')
+    assert edit_url in author_content, (
+        'Убедитесь, что автор видит ссылку редактирования поста при '
+        'кэшировании оболочки страницы.'
+    )
+    assert user.username in author_content
+    assert '<!--fragment:' not in author_content
+
+    other_content = another_user_client.get(url).content.decode('utf-8')
+    assert edit_url not in other_content, (
+        'Убедитесь, что персональные фрагменты автора не попадают в '
+        'кэшированную оболочку страницы.'
+    )
+    assert 'csrfmiddlewaretoken' in other_content
+
+
+@override_settings(PAGE_SHELLS=True)
+def test_shell_is_invalidated_by_new_comment(shell_post, user_client):
+    url = f'/posts/{shell_post.id}/'
+    user_client.get(url)
+    user_client.post(
+        f'/posts/{shell_post.id}/comment/', {'text': 'Свежий комментарий'}
+    )
+    content = user_client.get(url).content.decode('utf-8')
+    assert 'Свежий комментарий' in content, (
+        'Убедитесь, что кэш оболочки поста сбрасывается при добавлении '
+        'комментария.'
+    )
+
+
+@override_settings(PAGE_SHELLS=True)
+def test_shell_is_invalidated_by_category_and_username(
+    shell_post, user, client
+):
+    url = f'/posts/{shell_post.id}/'
+    client.get(url)
+    category = shell_post.category
+    category.title = 'Новое название'
+    category.save()
+    user.username = 'renamed_author'
+    user.save()
+    content = client.get(url).content.decode('utf-8')
+    assert 'Новое название' in content and 'renamed_author' in content, (
+        'Убедитесь, что кэш оболочки поста сбрасывается при изменении '
+        'категории и имени автора.'
+    )
+
+
+@override_settings(PAGE_SHELLS=True, PAGE_SHELL_ESI=True)
+def test_esi_shell_is_public_and_fragment_is_private(
+    shell_post, user_client
+):
+    response = user_client.get(f'/posts/{shell_post.id}/')
+    content = response.content.decode('utf-8')
+    assert '<esi:include' in content
+    assert 'public' in response['Cache-Control'], (
+        'Убедитесь, что в режиме ESI оболочка опубликованного поста '
+        'кэшируется общим кэшем.'
+    )
+    fragment = user_client.get(
+        '/fragments/post_actions/',
+        {'args': f'{shell_post.id},{shell_post.author_id}'},
+    )
+    assert f'/posts/{shell_post.id}/edit/' in fragment.content.decode()
+    assert 'private' in fragment['Cache-Control'], (
+        'Убедитесь, что персональные фрагменты не кэшируются общим кэшем.'
+    )
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    return mixer.cycle(100).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image='',
+    )
+
+
+def post_counts(queries):
+    return [
+        query['sql'] for query in queries
+        if 'COUNT(' in query['sql'] and 'FROM "blog_post"' in query['sql']
+    ]
+
+
+@override_settings(PAGINATOR_WINDOW=1)
+def test_paginator_renders_window_of_pages(client, many_posts):
+    response = client.get(reverse('blog:index'), {'page': 3})
+    window = list(response.context['page_window'])
+    assert window == [1, 2, 3, 4, '…', 10], (
+        'Убедитесь, что пагинатор показывает только страницы вокруг '
+        'текущей и по краям.'
+    )
+
+
+def test_feeds_take_post_count_from_cache(
+    client, many_posts, published_category, user
+):
+    urls = (
+        reverse('blog:index'),
+        reverse('blog:category_posts', args=[published_category.slug]),
+        reverse('blog:profile', args=[user.username]),
+    )
+    for url in urls:
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.context['paginator'].count == len(many_posts)
+        assert not post_counts(queries), (
+            'Убедитесь, что число постов ленты берётся из кэша, а не '
+            'считается запросом на каждой странице.'
+        )
+
+
+def test_publish_change_invalidates_counts(
+    client, many_posts, published_category
+):
+    url = reverse('blog:category_posts', args=[published_category.slug])
+    client.get(url)
+    post = many_posts[0]
+    post.is_published = False
+    post.save()
+    response = client.get(url)
+    assert response.context['paginator'].count == len(many_posts) - 1, (
+        'Убедитесь, что счётчики постов сбрасываются при снятии поста '
+        'с публикации.'
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(reverse('blog:index')).context[
+        'paginator'
+    ].count == 0, (
+        'Убедитесь, что счётчики постов сбрасываются при изменении '
+        'категории.'
+    )
@@ -0,0 +1,65 @@
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = ' '.join(f'слово{i}' for i in range(1000))
+
+
+@pytest.fixture
+def long_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, text=LONG_TEXT, image='',
+    )
+
+
+def test_excerpt_is_maintained_on_save(long_post):
+    assert long_post.excerpt == ' '.join(LONG_TEXT.split()[:10]) + ' …', (
+        'Убедитесь, что при сохранении поста в `excerpt` записываются '
+        'первые слова текста.'
+    )
+    long_post.text = 'Новый текст'
+    long_post.save(update_fields=['text'])
+    long_post.refresh_from_db()
+    assert long_post.excerpt == 'Новый текст', (
+        'Убедитесь, что анонс обновляется вместе с текстом поста.'
+    )
+
+
+def test_feed_does_not_load_post_text(client, long_post):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('blog:index'))
+    assert long_post.excerpt in response.content.decode()
+    post_queries = [
+        query['sql'] for query in queries
+        if 'FROM "blog_post"' in query['sql']
+        and '"blog_post"."excerpt"' in query['sql']
+    ]
+    assert post_queries and all(
+        '"blog_post"."text"' not in sql for sql in post_queries
+    ), 'Убедитесь, что лента не загружает полный текст постов.'
+
+
+def test_post_detail_shows_full_text(client, long_post):
+    response = client.get(
+        reverse('blog:post_detail', kwargs={'id': long_post.id})
+    )
+    assert 'слово999' in response.content.decode(), (
+        'Убедитесь, что страница поста показывает полный текст.'
+    )
+
+
+def test_migration_backfills_excerpts(long_post):
+    type(long_post).objects.update(excerpt='')
+    migration = import_module('blog.migrations.0004_post_excerpt')
+    migration.backfill_excerpts(apps, connection.schema_editor())
+    long_post.refresh_from_db()
+    assert long_post.excerpt.startswith('слово0 '), (
+        'Убедитесь, что миграция заполняет анонсы существующих постов.'
+    )
@@ -0,0 +1,84 @@
+import pytest
+from blog.models import Post, RelatedPost
+from django.core.management import call_command
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+TOPICS = {
+    'космос': 'ракета орбита спутник космонавт',
+    'кухня': 'рецепт тесто духовка начинка',
+    'сад': 'грядка рассада полив урожай',
+}
+
+
+@pytest.fixture
+def topic_posts(mixer, user, published_category):
+    posts = {}
+    for topic, words in TOPICS.items():
+        posts[topic] = [
+            mixer.blend(
+                'blog.Post', author=user, category=published_category,
+                is_published=True, image='', title=f'{topic} {number}',
+                # Общее для всех постов слово — стоп-слово.
+                text=f'Заметка: {words} {words.split()[number]}',
+            )
+            for number in range(3)
+        ]
+    return posts
+
+
+def related_ids(post):
+    return set(
+        RelatedPost.objects.filter(post=post)
+        .values_list('related_id', flat=True)
+    )
+
+
+def test_related_posts_share_topic(client, topic_posts):
+    call_command('build_related_posts', '--full')
+    for posts in topic_posts.values():
+        for post in posts:
+            assert related_ids(post) == {
+                other.id for other in posts if other != post
+            }, 'Убедитесь, что похожими считаются посты с общими словами.'
+    first, second, third = topic_posts['кухня']
+    Post.objects.filter(pk=third.pk).update(is_published=False)
+    content = client.get(
+        reverse('blog:post_detail', args=[first.id])
+    ).content.decode()
+    assert reverse('blog:post_detail', args=[second.id]) in content, (
+        'Убедитесь, что страница поста показывает похожие публикации.'
+    )
+    assert reverse('blog:post_detail', args=[third.id]) not in content
+
+
+def test_incremental_update(topic_posts):
+    call_command('build_related_posts')
+    untouched = set(
+        RelatedPost.objects.filter(post__in=topic_posts['сад'])
+        .values_list('id', flat=True)
+    )
+    moved = topic_posts['космос'][0]
+    moved.title = 'кухня 3'
+    moved.text = f'Заметка: {TOPICS["кухня"]}'
+    moved.save()
+    hidden = topic_posts['кухня'][2]
+    Post.objects.filter(pk=hidden.pk).update(is_published=False)
+    call_command('build_related_posts')
+    kitchen = {post.id for post in topic_posts['кухня'][:2]}
+    assert related_ids(moved) == kitchen, (
+        'Убедитесь, что без `--full` пересчитывается изменённый пост.'
+    )
+    for post in topic_posts['космос'][1:]:
+        assert moved.id not in related_ids(post)
+    for post in topic_posts['кухня'][:2]:
+        assert moved.id in related_ids(post)
+        assert hidden.id not in related_ids(post)
+    assert not related_ids(hidden), (
+        'Убедитесь, что снятый с публикации пост убирается из индекса.'
+    )
+    assert untouched == set(
+        RelatedPost.objects.filter(post__in=topic_posts['сад'])
+        .values_list('id', flat=True)
+    ), 'Убедитесь, что списки незатронутых постов не пересчитываются.'
@@ -0,0 +1,59 @@
+import pytest
+from core.middleware import ReplicaRoutingMiddleware
+from core.routers import ReplicaRouter, replica_reads
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+
+@pytest.fixture
+def replica():
+    alias = settings.REPLICA_DATABASE
+    connections.databases[alias] = dict(connections.databases['default'])
+    yield alias
+    del connections.databases[alias]
+
+
+def test_reads_outside_read_only_views_use_primary(PostModel, replica):
+    assert ReplicaRouter().db_for_read(PostModel) is None, (
+        'Убедитесь, что вне read-only представлений чтения идут '
+        'в основную БД.'
+    )
+
+
+def test_reads_go_to_replica_until_first_write(PostModel, replica):
+    router = ReplicaRouter()
+    with replica_reads():
+        assert router.db_for_read(PostModel) == replica, (
+            'Убедитесь, что read-only представления читают из реплики.'
+        )
+        assert router.db_for_write(PostModel) == 'default'
+        assert router.db_for_read(PostModel) is None, (
+            'Убедитесь, что после записи чтения в рамках запроса '
+            'идут в основную БД.'
+        )
+
+
+def test_replica_is_not_migrated(replica):
+    assert ReplicaRouter().allow_migrate(replica, 'blog') is False
+
+
+@pytest.mark.parametrize('method, expected', [('get', True), ('post', False)])
+def test_middleware_marks_safe_requests(PostModel, replica, method, expected):
+    from blog.views import PostListView
+
+    routed = []
+
+    def get_response(request):
+        routed.append(ReplicaRouter().db_for_read(PostModel) == replica)
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    request = getattr(RequestFactory(), method)('/')
+    middleware.process_view(request, PostListView.as_view(), (), {})
+    middleware(request)
+    assert routed == [expected]
+    assert ReplicaRouter().db_for_read(PostModel) is None, (
+        'Убедитесь, что маршрутизация в реплику сбрасывается после запроса.'
+    )
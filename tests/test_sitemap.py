@@ -0,0 +1,142 @@
+import os
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def sitemap_settings(tmp_path):
+    cache.clear()
+    with override_settings(SITEMAP_SHARD_SIZE=2, SITEMAP_BATCH_SIZE=1,
+                           SITEMAP_CACHE_DIR=str(tmp_path)):
+        yield tmp_path
+    cache.clear()
+
+
+@pytest.fixture
+def sitemap_posts(mixer, user, published_category):
+    return mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image='',
+    )
+
+
+def shard_content(client, section, number):
+    response = client.get(
+        reverse('blog:sitemap_shard', args=[section, number])
+    )
+    assert response.status_code == 200
+    return b''.join(response.streaming_content).decode()
+
+
+def test_index_lists_shards(client, sitemap_posts):
+    content = b''.join(
+        client.get(reverse('blog:sitemap')).streaming_content
+    ).decode()
+    first, last = sitemap_posts[0].pk, sitemap_posts[-1].pk
+    expected = {(number - 1) // 2 for number in range(first, last + 1)}
+    for number in expected:
+        assert reverse('blog:sitemap_shard', args=['posts', number]) in (
+            content
+        ), 'Убедитесь, что индекс карты сайта перечисляет все шарды постов.'
+    assert 'sitemap-categories-' in content
+    assert 'sitemap-profiles-' in content
+
+
+def test_shard_is_written_and_then_served_from_file(
+    client, sitemap_posts, sitemap_settings
+):
+    post = sitemap_posts[-1]
+    number = (post.pk - 1) // 2
+    content = shard_content(client, 'posts', number)
+    assert reverse('blog:post_detail', args=[post.pk]) in content
+    assert post.pub_date.isoformat() in content, (
+        'Убедитесь, что в карте сайта указана дата публикации поста.'
+    )
+    assert content.count('<url>') <= 2, (
+        'Убедитесь, что шард содержит не больше SITEMAP_SHARD_SIZE адресов.'
+    )
+    with CaptureQueriesContext(connection) as queries:
+        assert shard_content(client, 'posts', number) == content
+    assert not queries, 'Убедитесь, что готовый шард отдаётся из файла.'
+
+
+def test_post_change_regenerates_only_its_shard(
+    client, sitemap_posts, sitemap_settings
+):
+    numbers = sorted({(post.pk - 1) // 2 for post in sitemap_posts})
+    for number in numbers:
+        shard_content(client, 'posts', number)
+    post = sitemap_posts[0]
+    post.is_published = False
+    post.save()
+    files = set(os.listdir(sitemap_settings))
+    assert f'sitemap-posts-{numbers[0]}.xml' not in files
+    assert f'sitemap-posts-{numbers[-1]}.xml' in files, (
+        'Убедитесь, что изменение поста сбрасывает только его шард.'
+    )
+    assert reverse('blog:post_detail', args=[post.pk]) not in shard_content(
+        client, 'posts', numbers[0]
+    )
+
+
+def test_unlisted_shards_are_404(client, sitemap_posts, sitemap_settings):
+    last = (sitemap_posts[-1].pk - 1) // 2
+    for section, number in (('unknown', 0), ('posts', last + 1000)):
+        url = reverse('blog:sitemap_shard', args=[section, number])
+        assert client.get(url).status_code == 404, (
+            'Убедитесь, что шарды, которых нет в индексе, не создаются.'
+        )
+    assert not os.listdir(sitemap_settings)
+
+
+@override_settings(SITE_URL='https://blogicum.example')
+def test_urls_use_site_url(client, sitemap_posts):
+    post = sitemap_posts[-1]
+    content = shard_content(client, 'posts', (post.pk - 1) // 2)
+    url = reverse('blog:post_detail', args=[post.pk])
+    assert f'<loc>https://blogicum.example{url}</loc>' in content, (
+        'Убедитесь, что адреса в карте сайта строятся от SITE_URL, а не '
+        'от заголовка Host запроса.'
+    )
+
+
+async def asgi_get(path):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await ASGIHandler()(
+        {'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+         'headers': [(b'host', b'localhost')]},
+        receive, send,
+    )
+    return messages
+
+
+# Представление выполняется в другом потоке со своим соединением с БД.
+@pytest.mark.django_db(transaction=True)
+def test_cold_shard_under_asgi(sitemap_posts):
+    post = sitemap_posts[-1]
+    messages = async_to_sync(asgi_get)(
+        reverse('blog:sitemap_shard', args=['posts', (post.pk - 1) // 2])
+    )
+    assert messages[0]['status'] == 200
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    assert reverse('blog:post_detail', args=[post.pk]).encode() in body, (
+        'Убедитесь, что шард, которого ещё нет в файле, отдаётся под ASGI '
+        'без обращений к БД из цикла событий.'
+    )
+    assert body.endswith(b'</urlset>\n')
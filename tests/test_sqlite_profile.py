@@ -0,0 +1,52 @@
+import pytest
+from core.backends.sqlite3.base import DatabaseWrapper
+from django.conf import settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_wrapper(name, **extra):
+    settings_dict = {
+        **settings.DATABASE_PROFILES['production'],
+        'NAME': name,
+        'OPTIONS': {},
+        'TIME_ZONE': None,
+        'AUTOCOMMIT': True,
+        'ATOMIC_REQUESTS': False,
+        **extra,
+    }
+    return DatabaseWrapper(settings_dict, alias='profile_test')
+
+
+def test_production_profile_applies_pragmas(tmp_path):
+    wrapper = make_wrapper(tmp_path / 'db.sqlite3')
+    try:
+        with wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+            cursor.execute('PRAGMA busy_timeout')
+            busy_timeout = cursor.fetchone()[0]
+    finally:
+        wrapper.close()
+    assert journal_mode == 'wal', (
+        'Убедитесь, что production-профиль БД включает журнал WAL.'
+    )
+    assert busy_timeout == (
+        settings.SQLITE_PRODUCTION_PRAGMAS['busy_timeout']
+    ), 'Убедитесь, что production-профиль БД задаёт busy_timeout.'
+
+
+def test_production_profile_uses_immediate_transactions(tmp_path):
+    wrapper = make_wrapper(tmp_path / 'db.sqlite3')
+    executed = []
+    try:
+        wrapper.ensure_connection()
+        wrapper.connection.set_trace_callback(executed.append)
+        wrapper._start_transaction_under_autocommit()
+        wrapper.connection.rollback()
+    finally:
+        wrapper.close()
+    assert 'BEGIN IMMEDIATE' in executed, (
+        'Убедитесь, что production-профиль БД открывает транзакции '
+        'в режиме IMMEDIATE.'
+    )
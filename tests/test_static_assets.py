@@ -0,0 +1,52 @@
+import re
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import override_settings
+
+
+@pytest.fixture
+def collected_static(tmp_path):
+    with override_settings(
+        STATIC_ROOT=tmp_path,
+        STATICFILES_STORAGE=(
+            'core.storage.CompressedManifestStaticFilesStorage'
+        ),
+        SERVE_STATIC=True,
+    ):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        yield tmp_path
+
+
+def test_collectstatic_creates_hashed_and_gzip_files(collected_static):
+    hashed_icon = staticfiles_storage.url('img/fav/favicon.ico')
+    assert re.search(r'favicon\.[0-9a-f]{12}\.ico$', hashed_icon), (
+        'Убедитесь, что статика собирается с хэшем содержимого в имени.'
+    )
+    name = hashed_icon.rsplit('/static/', 1)[-1]
+    assert (collected_static / f'{name}.gz').is_file(), (
+        'Убедитесь, что для сжимаемой статики создаются gzip-копии.'
+    )
+    rendered = Template(
+        "{% load static %}{% static 'img/logo.png' %}"
+    ).render(Context())
+    assert re.search(r'logo\.[0-9a-f]{12}\.png$', rendered), (
+        'Убедитесь, что тег `static` выдаёт хэшированные имена файлов.'
+    )
+
+
+@pytest.mark.django_db
+def test_hashed_static_is_immutable_and_gzipped(collected_static, client):
+    url = staticfiles_storage.url('img/fav/favicon.ico')
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip', (
+        'Убедитесь, что клиенту, принимающему gzip, отдаётся сжатая копия.'
+    )
+    assert 'immutable' in response['Cache-Control']
+    assert 'Accept-Encoding' in response['Vary']
+    plain = client.get(url)
+    assert not plain.has_header('Content-Encoding')
+    assert response['Content-Type'] == plain['Content-Type']
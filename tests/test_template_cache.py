@@ -0,0 +1,31 @@
+import pytest
+from django.conf import settings
+from django.template import engines
+from django.test import override_settings
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            settings.TEMPLATE_LOADERS,
+        )],
+    },
+}]
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+def test_warm_templates_compiles_project_templates():
+    from core.templating import warm_templates
+
+    count = warm_templates()
+    template_files = list(settings.TEMPLATES_DIR.rglob('*.html'))
+    assert count == len(template_files), (
+        'Убедитесь, что `warm_templates` компилирует все шаблоны проекта.'
+    )
+    loader = engines['django'].engine.template_loaders[0]
+    for name in ('blog/index.html', 'includes/post_card.html'):
+        assert name in loader.get_template_cache, (
+            'Убедитесь, что после прогрева шаблоны лежат в кэше загрузчика.'
+        )
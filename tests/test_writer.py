@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+from core.writer import run_write
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.test import override_settings
+
+N_WRITERS = 200
+
+
+@pytest.fixture
+def file_database(tmp_path):
+    alias = 'writer_stress'
+    connections.databases[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': tmp_path / 'stress.sqlite3',
+        # Без ожидания блокировки любая конкурентная запись падает сразу.
+        'OPTIONS': {'timeout': 0},
+    }
+    connections.ensure_defaults(alias)
+    connections.prepare_test_settings(alias)
+    call_command('migrate', database=alias, verbosity=0)
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+@pytest.mark.django_db
+@override_settings(SERIALIZED_WRITES=True)
+def test_serialized_writes_have_no_lock_errors(file_database):
+    from blog.models import Category, Comment, Post
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    user = get_user_model().objects.using(file_database).create(
+        username='writer'
+    )
+    category = Category.objects.using(file_database).create(
+        title='Категория', description='Описание', slug='stress'
+    )
+    post = Post.objects.using(file_database).create(
+        title='Пост', text='Текст', pub_date=timezone.now(),
+        author=user, category=category,
+    )
+
+    errors = []
+    barrier = threading.Barrier(N_WRITERS)
+
+    def writer(number):
+        barrier.wait()
+        try:
+            run_write(
+                Comment.objects.using(file_database).create,
+                text=f'Комментарий {number}',
+                post_id=post.id,
+                author_id=user.id,
+                using=file_database,
+            )
+        except OperationalError as error:
+            errors.append(error)
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=writer, args=(number,))
+        for number in range(N_WRITERS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, (
+        'Убедитесь, что при SERIALIZED_WRITES конкурентные записи '
+        'не приводят к ошибкам блокировки БД.'
+    )
+    assert Post.objects.using(file_database).count() == 1
+    assert Comment.objects.using(file_database).count() == N_WRITERS, (
+        'Убедитесь, что при SERIALIZED_WRITES сохраняется каждая запись.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(SERIALIZED_WRITES=True)
+def test_views_send_only_db_writes_to_writer(
+    user_client, user, published_category, published_location, tmp_path,
+    monkeypatch
+):
+    from io import BytesIO
+
+    from blog.models import Comment, Post
+    from core.storage import ContentAddressedStorage
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.db.models.signals import post_save
+    from django.urls import reverse
+    from PIL import Image
+
+    threads = {}
+
+    def remember_thread(sender, **kwargs):
+        threads[sender.__name__] = threading.current_thread().name
+
+    storage_save = ContentAddressedStorage.save
+
+    def remember_storage_thread(self, *args, **kwargs):
+        threads['storage'] = threading.current_thread().name
+        return storage_save(self, *args, **kwargs)
+
+    monkeypatch.setattr(ContentAddressedStorage, 'save',
+                        remember_storage_thread)
+    for model in (Post, Comment):
+        post_save.connect(remember_thread, sender=model)
+    buffer = BytesIO()
+    Image.new('RGB', (4, 4), 'red').save(buffer, 'GIF')
+    try:
+        with override_settings(MEDIA_ROOT=tmp_path):
+            response = user_client.post(reverse('blog:create_post'), {
+                'title': 'Через писателя', 'text': 'Текст',
+                'pub_date': '2020-01-01 10:00', 'is_published': True,
+                'category': published_category.id,
+                'location': published_location.id,
+                'image': SimpleUploadedFile('photo.gif', buffer.getvalue()),
+            })
+        assert response.status_code == 302
+        post = Post.objects.get(title='Через писателя')
+        response = user_client.post(
+            reverse('blog:add_comment', args=[post.id]),
+            {'text': 'Комментарий'}, HTTP_X_FRAGMENT='json',
+        )
+        assert response.status_code == 201
+    finally:
+        for model in (Post, Comment):
+            post_save.disconnect(remember_thread, sender=model)
+    assert post.image and post.author == user
+    assert threads['Post'].startswith('db-writer'), (
+        'Убедитесь, что при SERIALIZED_WRITES пост сохраняется в '
+        'потоке-писателе.'
+    )
+    assert threads['Comment'].startswith('db-writer')
+    assert not threads['storage'].startswith('db-writer'), (
+        'Убедитесь, что файл изображения сохраняется до передачи записи '
+        'потоку-писателю.'
+    )